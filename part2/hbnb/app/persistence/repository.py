@@ -27,11 +27,58 @@ class Repository(ABC):
 
 
 class InMemoryRepository(Repository):
-    def __init__(self):
+    def __init__(self, unique_indexes=(), indexes=()):
+        """
+        Args:
+            unique_indexes (iterable): attributes whose value identifies
+                at most one object (e.g. 'email')
+            indexes (iterable): attributes shared by many objects
+                (e.g. 'place_id')
+        """
         self._storage = {}
+        # attr -> value -> obj
+        self._unique_indexes = {attr: {} for attr in unique_indexes}
+        # attr -> value -> {obj_id: obj}, dicts keep insertion order
+        self._indexes = {attr: {} for attr in indexes}
+        # obj_id -> {attr: value} as indexed, to unindex after mutation
+        self._indexed_values = {}
+
+    def _check_unique(self, obj_id, values):
+        for attr, index in self._unique_indexes.items():
+            if attr not in values or values[attr] is None:
+                continue
+            other = index.get(values[attr])
+            if other is not None and other.id != obj_id:
+                raise ValueError(f"An object with this {attr} already exists.")
+
+    def _index(self, obj):
+        values = {}
+        for attr, index in self._unique_indexes.items():
+            values[attr] = getattr(obj, attr, None)
+            if values[attr] is not None:
+                index[values[attr]] = obj
+        for attr, index in self._indexes.items():
+            values[attr] = getattr(obj, attr, None)
+            index.setdefault(values[attr], {})[obj.id] = obj
+        self._indexed_values[obj.id] = values
+
+    def _unindex(self, obj_id):
+        values = self._indexed_values.pop(obj_id, {})
+        for attr, value in values.items():
+            if attr in self._unique_indexes:
+                self._unique_indexes[attr].pop(value, None)
+                continue
+            bucket = self._indexes[attr].get(value, {})
+            bucket.pop(obj_id, None)
+            if not bucket:
+                self._indexes[attr].pop(value, None)
 
     def add(self, obj):
+        self._check_unique(obj.id, {attr: getattr(obj, attr, None)
+                                    for attr in self._unique_indexes})
+        self._unindex(obj.id)
         self._storage[obj.id] = obj
+        self._index(obj)
 
     def get(self, obj_id):
         return self._storage.get(obj_id)
@@ -42,11 +89,32 @@ class InMemoryRepository(Repository):
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
-            obj.update(data)
+            self._check_unique(obj.id, data)
+            self._unindex(obj.id)
+            try:
+                obj.update(data)
+            finally:
+                self._index(obj)
 
     def delete(self, obj_id):
         if obj_id in self._storage:
+            self._unindex(obj_id)
             del self._storage[obj_id]
 
     def get_by_attribute(self, attr_name, attr_value):
+        # Indexed attributes are a single hash lookup
+        if attr_name in self._unique_indexes:
+            return self._unique_indexes[attr_name].get(attr_value)
+        if attr_name in self._indexes:
+            bucket = self._indexes[attr_name].get(attr_value)
+            return next(iter(bucket.values())) if bucket else None
+        # Otherwise fall back to a full scan
         return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        if attr_name in self._unique_indexes:
+            obj = self._unique_indexes[attr_name].get(attr_value)
+            return [obj] if obj is not None else []
+        if attr_name in self._indexes:
+            return list(self._indexes[attr_name].get(attr_value, {}).values())
+        return [obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value]
@@ -16,9 +16,9 @@ class HBnBFacade:
 
         Initialize repositories for user, place, review, and amenity
         """
-        self.user_repo = InMemoryRepository()
+        self.user_repo = InMemoryRepository(unique_indexes=('email',))
         self.place_repo = InMemoryRepository()
-        self.review_repo = InMemoryRepository()
+        self.review_repo = InMemoryRepository(indexes=('place_id',))
         self.amenity_repo = InMemoryRepository()
 
 # USER ENDPOINTS
@@ -95,8 +95,7 @@ class HBnBFacade:
         if not user:
             return None
 
-        user.update(user_data)
-        self.user_repo.update(user, user_data)
+        self.user_repo.update(user.id, user_data)
         return user
 
 # AMENITY ENDPOINTS
@@ -159,8 +158,7 @@ class HBnBFacade:
         if not amenity:
             return None
 
-        amenity.update(amenity_data)
-        self.amenity_repo.update(amenity, amenity_data)
+        self.amenity_repo.update(amenity.id, amenity_data)
         return amenity
 
 # PLACE ENDPOINTS
@@ -226,8 +224,7 @@ class HBnBFacade:
         if not place:
             return None
 
-        place.update(place_data)
-        self.place_repo.update(place, place_data)
+        self.place_repo.update(place.id, place_data)
         return place
 
 # REVIEW ENDPOINTS
@@ -285,7 +282,7 @@ class HBnBFacade:
         Returns:
             list: A list of all Review objects for the specified place
         """
-        return self.review_repo.get_by_attribute('place_id', place_id)
+        return self.review_repo.get_all_by_attribute('place_id', place_id)
 
     def update_review(self, review_id, review_data):
         """
@@ -304,8 +301,7 @@ class HBnBFacade:
         if not review:
             return None
 
-        review.update(review_data)
-        self.review_repo.update(review, review_data)
+        self.review_repo.update(review.id, review_data)
         return review
 
     def delete_review(self, review_id):
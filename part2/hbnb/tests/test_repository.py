@@ -0,0 +1,74 @@
+import unittest
+from app.models.user import User
+from app.models.review import Review
+from app.persistence.repository import InMemoryRepository
+
+
+class TestInMemoryRepositoryIndexes(unittest.TestCase):
+
+    def setUp(self):
+        self.users = InMemoryRepository(unique_indexes=('email',))
+        self.reviews = InMemoryRepository(indexes=('place_id',))
+
+    def test_unique_index_lookup(self):
+        """
+        Test that an email lookup hits the unique index
+        """
+        user = User("Jane", "Doe", "jane@example.com")
+        self.users.add(user)
+        self.assertIs(self.users.get_by_attribute('email', 'jane@example.com'), user)
+        self.assertIsNone(self.users.get_by_attribute('email', 'nope@example.com'))
+
+    def test_unique_index_rejects_duplicates(self):
+        """
+        Test that adding or updating to an existing email is refused
+        """
+        self.users.add(User("Jane", "Doe", "jane@example.com"))
+        other = User("John", "Doe", "john@example.com")
+        self.users.add(other)
+        with self.assertRaises(ValueError):
+            self.users.add(User("Jim", "Doe", "jane@example.com"))
+        with self.assertRaises(ValueError):
+            self.users.update(other.id, {'email': 'jane@example.com'})
+        self.assertEqual(other.email, 'john@example.com')
+
+    def test_index_follows_update_and_delete(self):
+        """
+        Test that the index is maintained on update and delete
+        """
+        user = User("Jane", "Doe", "jane@example.com")
+        self.users.add(user)
+        self.users.update(user.id, {'email': 'jane.doe@example.com'})
+        self.assertIsNone(self.users.get_by_attribute('email', 'jane@example.com'))
+        self.assertIs(self.users.get_by_attribute('email', 'jane.doe@example.com'), user)
+        self.users.delete(user.id)
+        self.assertIsNone(self.users.get_by_attribute('email', 'jane.doe@example.com'))
+
+    def test_non_unique_index(self):
+        """
+        Test retrieving every review of a place through the index
+        """
+        first = Review("Great", 5, "place-1", "user-1")
+        second = Review("Fine", 3, "place-1", "user-2")
+        third = Review("Bad", 1, "place-2", "user-1")
+        for review in (first, second, third):
+            self.reviews.add(review)
+        self.assertEqual(self.reviews.get_all_by_attribute('place_id', 'place-1'),
+                         [first, second])
+        self.reviews.delete(first.id)
+        self.assertEqual(self.reviews.get_all_by_attribute('place_id', 'place-1'),
+                         [second])
+        self.assertEqual(self.reviews.get_all_by_attribute('place_id', 'none'), [])
+
+    def test_unindexed_attribute_falls_back_to_scan(self):
+        """
+        Test lookups on attributes without an index
+        """
+        review = Review("Great", 5, "place-1", "user-1")
+        self.reviews.add(review)
+        self.assertIs(self.reviews.get_by_attribute('user_id', 'user-1'), review)
+        self.assertEqual(self.reviews.get_all_by_attribute('user_id', 'user-1'), [review])
+
+
+if __name__ == '__main__':
+    unittest.main()
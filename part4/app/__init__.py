@@ -7,8 +7,17 @@ from app.api.v1.reviews import api as reviews_ns, places_reviews_ns
 from app.api.v1.places import api as places_ns
 from app.api.v1.auth import api as login_ns
 from app.api.v1.protected import api as protected_ns
+from app.api.v1.stats import api as stats_ns
+from app.api.v1.serializers import output_json
 from flask_jwt_extended import JWTManager
 from app.extensions import db, bcrypt
+from app.passwords import password_hasher, PasswordHasherBusy
+from app.persistence.unit_of_work import unit_of_work
+from app.persistence.cache import object_cache, response_cache
+from app.persistence.amenity_index import amenity_index
+from app.persistence import migrations
+from app.persistence.engine import configure_engine
+from app.cli import hbnb_cli
 
 # instanciate the jwt object
 jwt = JWTManager()
@@ -20,6 +29,8 @@ def create_app(config_class="config.DevelopmentConfig"):
 
     api = Api(app, version='1.0', title='HBnB API',
               description='HBnB Application API')
+    # Every namespace answers through the same JSON encoder
+    api.representations['application/json'] = output_json
 
     # Register the differents namespace
     api.add_namespace(users_ns, path='/api/v1/users')
@@ -29,17 +40,42 @@ def create_app(config_class="config.DevelopmentConfig"):
     api.add_namespace(places_reviews_ns, path='/api/v1/places')
     api.add_namespace(login_ns, path='/api/v1/auth')
     api.add_namespace(protected_ns, path='/api/v1')
+    api.add_namespace(stats_ns, path='/api/v1/stats')
 
     # Initialize bcrypt
     bcrypt.init_app(app)
+    password_hasher.init_app(app)
+
+    @api.errorhandler(PasswordHasherBusy)
+    def password_hasher_busy(error):
+        # Shed load instead of queueing logins behind each other
+        return {'error': str(error)}, 503, {'Retry-After': '1'}
 
     # initialize jwt
     jwt.init_app(app)
 
     # initialize db
     db.init_app(app)
+    configure_engine(app)
+
+    # commit once per request
+    unit_of_work.init_app(app)
+
+    # initialize the object and response caches
+    object_cache.init_app(app)
+    response_cache.init_app(app)
+    amenity_index.init_app(app)
+
+    # maintenance commands (flask hbnb ...)
+    app.cli.add_command(hbnb_cli)
+
+    # bring the schema up to date
+    if app.config.get('AUTO_MIGRATE'):
+        with app.app_context():
+            migrations.upgrade()
 
     # initialize cors
-    CORS(app, resources={r"/*": {"origins": "*"}}, allow_headers=["Content-Type", "Authorization"])
+    CORS(app, resources={r"/*": {"origins": "*"}}, allow_headers=["Content-Type", "Authorization"],
+         expose_headers=["X-Next-Cursor"])
 
     return app
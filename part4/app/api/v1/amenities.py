@@ -1,6 +1,12 @@
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.api.v1.pagination import pagination_parser, page_args, page_headers
+from app.api.v1.caching import cached_response
+from app.api.v1.conditional import detail_validators, list_validators, not_modified
+from app.api.v1.serializers import serialize, serialize_many
+from app.models.amenity import Amenity
+from app.models.place import Place
 
 api = Namespace("amenities", description="Amenity operations")
 
@@ -37,42 +43,48 @@ class AmenityList(Resource):
 
         amenity_data = api.payload
 
-        amenities = facade.get_all_amenities()
-        for amenity_item in amenities:
-            if amenity_item.name == amenity_data["name"]:
-                return {"error": "Amenity already registered"}, 400
-
-        new_amenity = facade.create_amenity(amenity_data)
-        return {
-            "id": new_amenity.id,
-            "name": new_amenity.name
-        }, 201
+        try:
+            new_amenity = facade.create_amenity(amenity_data)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return serialize(Amenity, "detail", new_amenity), 201
 
+    @api.expect(pagination_parser)
     @api.response(200, "List of amenities retrieved successfully")
+    @api.response(304, "List unchanged since the given ETag")
+    @api.response(400, "Invalid cursor")
+    @cached_response("Amenity")
     def get(self):
         """
-        Get the list of all amenities
+        Get one page of amenities
 
         Returns:
             tuple: A tuple containing:
                 - list: A list of dictionnaries, each containing amenity data
                 - int: HTTP status code 200 for success
+                - dict: X-Next-Cursor header when another page exists
         """
-        amenities = facade.get_all_amenities()
+        limit, cursor = page_args()
+        validators = list_validators(facade.get_amenities_version())
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
+        try:
+            amenities, next_cursor = facade.get_amenities_page(
+                limit, cursor, columns=("name",))
+        except ValueError as e:
+            return {"error": str(e)}, 400
 
-        return [
-            {
-                "id": amenity_item.id,
-                "name": amenity_item.name
-            }
-            for amenity_item in amenities
-        ], 200
+        return serialize_many(Amenity, "detail", amenities), 200, \
+            {**page_headers(next_cursor), **validators}
 
 
 @api.route("/<amenity_id>")
 class AmenityResource(Resource):
     @api.response(200, "Amenity details retrieved successfully")
+    @api.response(304, "Amenity unchanged since the given ETag or date")
     @api.response(404, "Amenity not found")
+    @cached_response("Amenity:{amenity_id}")
     def get(self, amenity_id):
         """
         Get amenity details by ID.
@@ -86,14 +98,15 @@ class AmenityResource(Resource):
                 or an error message.
                 - int: HTTP status code (200 if successful, 404 if not found)
         """
+        validators = detail_validators(facade.get_amenity_version(amenity_id))
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
         amenity = facade.get_amenity(amenity_id)
         if not amenity:
             return {"error": "Amenity not found"}, 404
         else:
-            return {
-                "id": amenity.id,
-                "name": amenity.name
-            }, 200
+            return serialize(Amenity, "detail", amenity), 200, validators
 
     @api.expect(amenity_model, validate=True)
     @api.response(200, "Amenity updated successfully")
@@ -132,7 +145,43 @@ class AmenityResource(Resource):
         if not amenity:
             return {"error": "Amenity not found"}, 404
         else:
-            return {
-                "id": amenity.id,
-                "name": amenity.name
-            }, 200
+            return serialize(Amenity, "detail", amenity), 200
+
+
+@api.route("/<amenity_id>/places")
+class AmenityPlaceList(Resource):
+    @api.expect(pagination_parser)
+    @api.response(200, "List of places retrieved successfully")
+    @api.response(304, "List unchanged since the given ETag")
+    @api.response(400, "Invalid cursor")
+    @api.response(404, "Amenity not found")
+    @cached_response("Amenity:{amenity_id}", "Place")
+    def get(self, amenity_id):
+        """
+        Get one page of the places offering an amenity
+
+        Args:
+            amenity_id (UUID): The ID of the amenity
+
+        Returns:
+            tuple: A tuple containing:
+                - list: A list of dictionnaries, each containing place data
+                - int: HTTP status code (200 if successful, 404 if not found)
+                - dict: X-Next-Cursor header when another page exists
+        """
+        if facade.get_amenity_version(amenity_id) is None:
+            return {"error": "Amenity not found"}, 404
+
+        limit, cursor = page_args()
+        validators = list_validators(facade.get_amenity_places_version(amenity_id))
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
+        try:
+            places, next_cursor = facade.get_amenity_places_page(
+                amenity_id, limit, cursor, columns=("title", "price"))
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        return serialize_many(Place, "summary", places), 200, \
+            {**page_headers(next_cursor), **validators}
@@ -15,6 +15,9 @@ login_model = api.model('Login', {
 @api.route('/login')
 class Login(Resource):
     @api.expect(login_model)
+    @api.response(200, 'Login successful')
+    @api.response(401, 'Invalid credentials')
+    @api.response(503, 'Too many logins in progress, retry later')
     def post(self):
         """Authenticate user and return a JWT token"""
         # Get the email and password from the request payload
@@ -27,6 +30,9 @@ class Login(Resource):
         if not user or not user.verify_password(credentials['password']):
             return {'error': 'Invalid credentials'}, 401
 
+        # Bring the hash to the configured cost while we know the password
+        facade.upgrade_password_hash(user, credentials['password'])
+
         # Step 3: Create a JWT token with the user's id and is_admin flag
         access_token = create_access_token(
             identity={'id': str(user.id), 'is_admin': user.is_admin})
@@ -0,0 +1,82 @@
+""" Request parsing and per-row validation for the bulk endpoints """
+
+import json
+from flask import request
+from jsonschema import Draft4Validator
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def read_bulk_payload():
+    """
+    Read the rows of a bulk request
+
+    The body is either a JSON array of objects or NDJSON
+    (one JSON object per line, Content-Type: application/x-ndjson).
+
+    Returns:
+        list: the decoded rows
+
+    Raises:
+        ValueError: if the body cannot be decoded
+    """
+    if request.mimetype == NDJSON_MIMETYPE:
+        rows = []
+        for number, line in enumerate(request.stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                raise ValueError(f"Invalid JSON on line {number}")
+        return rows
+
+    rows = request.get_json(silent=True)
+    if not isinstance(rows, list):
+        raise ValueError("Expected a JSON array or an NDJSON body")
+    return rows
+
+
+def validate_rows(model, rows):
+    """
+    Validate every row against a Flask-RESTX model
+
+    Args:
+        model (Model): model describing a single row
+        rows (list): decoded rows
+
+    Returns:
+        tuple: list of (index, row) for valid rows and
+            a dict mapping the index of each invalid row to its errors
+    """
+    validator = Draft4Validator(model.__schema__)
+    valid, errors = [], {}
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors[index] = {'row': 'Expected a JSON object'}
+            continue
+        row_errors = dict(model.format_error(e) for e in validator.iter_errors(row))
+        if row_errors:
+            errors[index] = row_errors
+        else:
+            valid.append((index, row))
+    return valid, errors
+
+
+def bulk_results(created, errors):
+    """
+    Build the per-row response of a bulk endpoint
+
+    Args:
+        created (dict): index of each inserted row -> new object id
+        errors (dict): index of each rejected row -> errors
+
+    Returns:
+        dict: summary counts and results ordered by row index
+    """
+    results = [{'index': index, 'status': 201, 'id': obj_id}
+               for index, obj_id in created.items()]
+    results += [{'index': index, 'status': 400, 'errors': row_errors}
+                for index, row_errors in errors.items()]
+    results.sort(key=lambda result: result['index'])
+    return {'created': len(created), 'failed': len(errors), 'results': results}
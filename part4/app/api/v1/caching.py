@@ -0,0 +1,66 @@
+""" Response cache of the public GET endpoints """
+
+from functools import wraps
+from urllib.parse import urlencode
+from flask import make_response, request
+from app.api.v1.conditional import not_modified
+from app.api.v1.serializers import encode
+from app.persistence.cache import response_cache
+
+
+def cache_key():
+    """
+    Path and normalized query string: parameters sorted, empty ones dropped
+    """
+    args = sorted((name, value) for name, value in request.args.items(multi=True)
+                  if value != '')
+    return f'{request.path}?{urlencode(args)}'
+
+
+def _response(body, code, headers, status):
+    response = make_response(body, code)
+    response.headers.extend(headers)
+    response.headers['X-Cache'] = status
+    response.mimetype = 'application/json'
+    return response
+
+
+def cached_response(*tags):
+    """
+    Serve a GET from the response cache
+
+    Only 200 responses are stored, with their headers. A hit still
+    honours If-None-Match / If-Modified-Since.
+
+    Args:
+        tags: format strings over the view arguments
+            (e.g. 'Place:{place_id}'), or callables returning more
+            tags from the response data
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not response_cache.enabled:
+                return view(*args, **kwargs)
+            key = cache_key()
+            entry = response_cache.get(key)
+            if entry is not None:
+                body, headers = entry
+                return not_modified(headers) or _response(body, 200, headers, 'HIT')
+
+            ticket = response_cache.begin_read()
+            result = view(*args, **kwargs)
+            if not isinstance(result, tuple) or result[1] != 200:
+                return result
+            data, code, headers = (result + ({},))[:3]
+            entry_tags = []
+            for tag in tags:
+                if callable(tag):
+                    entry_tags.extend(tag(data))
+                else:
+                    entry_tags.append(tag.format(**kwargs))
+            body = encode(data)
+            response_cache.set(key, (body, dict(headers)), entry_tags, ticket)
+            return _response(body, code, headers, 'MISS')
+        return wrapper
+    return decorator
@@ -0,0 +1,64 @@
+""" Conditional GET (ETag / Last-Modified / 304) shared by the read endpoints """
+
+import hashlib
+from flask import Response, request
+from werkzeug.http import http_date, parse_date, quote_etag, unquote_etag
+
+
+def _validators(version, last_modified=None):
+    if version is None:
+        return {}
+    # The query string selects the page, filters and order of a list
+    key = repr((request.path, sorted(request.args.items(multi=True)), tuple(version)))
+    headers = {
+        'ETag': quote_etag(hashlib.blake2b(key.encode(), digest_size=16).hexdigest(),
+                           weak=True),
+        # Clients may keep the body but must revalidate before reusing it
+        'Cache-Control': 'no-cache',
+    }
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified)
+    return headers
+
+
+def detail_validators(version):
+    """
+    Validators of a single resource
+
+    Args:
+        version (tuple): timestamps of the resource (see the facade
+            get_*_version methods), None if it does not exist
+
+    Returns:
+        dict: ETag, Last-Modified (the latest timestamp) and
+            Cache-Control headers, empty without a version
+    """
+    timestamps = [value for value in version or () if value is not None]
+    return _validators(version, max(timestamps) if timestamps else None)
+
+
+def list_validators(version):
+    """
+    Validators of a list resource, versioned by row count and latest
+    updated_at. There is no Last-Modified: deleting a row does not move
+    the latest timestamp, only the count in the ETag.
+    """
+    return _validators(version)
+
+
+def not_modified(headers):
+    """
+    Return a 304 response if the client already holds the
+    representation described by the validator headers, else None
+
+    If-None-Match takes precedence over If-Modified-Since.
+    """
+    if not headers:
+        return None
+    if request.if_none_match:
+        fresh = request.if_none_match.contains_weak(unquote_etag(headers['ETag'])[0])
+    elif request.if_modified_since and 'Last-Modified' in headers:
+        fresh = parse_date(headers['Last-Modified']) <= request.if_modified_since
+    else:
+        fresh = False
+    return Response(status=304, headers=headers) if fresh else None
@@ -0,0 +1,40 @@
+""" Keyset pagination shared by the list endpoints """
+
+from flask import current_app
+from flask_restx import reqparse
+
+pagination_parser = reqparse.RequestParser()
+pagination_parser.add_argument(
+    'limit', type=int, location='args',
+    help='Maximum number of items to return')
+pagination_parser.add_argument(
+    'cursor', type=str, location='args',
+    help='Opaque cursor taken from the X-Next-Cursor header')
+
+
+def page_args(parser=pagination_parser, args=None):
+    """
+    Parse the limit and cursor query parameters
+
+    The limit falls back to API_PAGE_SIZE and is clamped
+    to API_MAX_PAGE_SIZE so a single page stays bounded.
+
+    Args:
+        parser (RequestParser): parser of the endpoint
+        args (dict): arguments the endpoint already parsed, if any
+
+    Returns:
+        tuple: limit (int) and cursor (string or None)
+    """
+    if args is None:
+        args = parser.parse_args()
+    limit = args.get('limit') or current_app.config['API_PAGE_SIZE']
+    limit = max(1, min(limit, current_app.config['API_MAX_PAGE_SIZE']))
+    return limit, args.get('cursor')
+
+
+def page_headers(next_cursor):
+    """
+    Headers advertising the next page, if any
+    """
+    return {'X-Next-Cursor': next_cursor} if next_cursor else {}
@@ -1,6 +1,15 @@
-from flask_restx import Namespace, Resource, fields
+from flask import current_app
+from flask_restx import Namespace, Resource, fields, reqparse
+from sqlalchemy.exc import SQLAlchemyError
 from app.services import facade
+from app.models.place import Place
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.api.v1.pagination import page_args, page_headers
+from app.api.v1.bulk import read_bulk_payload, validate_rows, bulk_results
+from app.api.v1.caching import cached_response
+from app.api.v1.conditional import detail_validators, list_validators, not_modified
+from app.api.v1.serializers import serialize, serialize_many, serializer
+from app.api.v1.streaming import list_parser, stream_response
 
 api = Namespace('places', description='Place operations')
 
@@ -65,6 +74,59 @@ place_update_model = api.model('PlaceUpdate', {
         )
 })
 
+# Model for one row of a bulk import (amenities are linked separately)
+place_bulk_model = api.model('PlaceBulk', {
+    **{key: field for key, field in place_model.items() if key != 'amenities'},
+    'owner_id': fields.String(
+        description='UUID of the owner (admin only, defaults to the caller)'
+        )
+})
+
+# Query parameters of the list endpoint: filters and ordering on top of paging
+place_list_parser = list_parser.copy()
+place_list_parser.add_argument('min_price', type=float, location='args',
+                               help='Lowest price per night included')
+place_list_parser.add_argument('max_price', type=float, location='args',
+                               help='Highest price per night included')
+place_list_parser.add_argument('amenities', type=str, location='args',
+                               help='Comma separated amenity IDs, all required')
+place_list_parser.add_argument('sort', type=str, location='args', default='created_at',
+                               help='created_at (default), price or -price')
+
+# Query parameters of the search endpoint
+search_parser = reqparse.RequestParser()
+search_parser.add_argument('q', type=str, location='args',
+                           help='Words to look for in titles and descriptions')
+search_parser.add_argument('cursor', type=str, location='args',
+                           help='Opaque cursor of the next text search page')
+search_parser.add_argument('lat', type=float, location='args',
+                           help='Latitude of the center (with lng and radius_km)')
+search_parser.add_argument('lng', type=float, location='args',
+                           help='Longitude of the center')
+search_parser.add_argument('radius_km', type=float, location='args',
+                           help='Search radius in kilometres')
+search_parser.add_argument('bbox', type=str, location='args',
+                           help='min_lng,min_lat,max_lng,max_lat')
+search_parser.add_argument('limit', type=int, location='args',
+                           help='Maximum number of places to return')
+
+# Columns returned by the search endpoint
+SEARCH_COLUMNS = ('title', 'price', 'latitude', 'longitude')
+
+
+def _parse_bbox(value):
+    """
+    Parse 'min_lng,min_lat,max_lng,max_lat' into (min_lat, min_lng, max_lat, max_lng)
+    """
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(part) for part in value.split(','))
+    except ValueError:
+        raise ValueError('bbox must be min_lng,min_lat,max_lng,max_lat')
+    if not (-90 <= min_lat <= max_lat <= 90) or \
+            not all(-180 <= lng <= 180 for lng in (min_lng, max_lng)):
+        raise ValueError('bbox is out of range')
+    return min_lat, min_lng, max_lat, max_lng
+
 
 @api.route('/')
 class PlaceList(Resource):
@@ -84,52 +146,167 @@ class PlaceList(Resource):
         place_data['price'] = round(place_data['price'], 2)
 
         # Create the place
-        place = facade.create_place(place_data)
-
-        # Retrieve owner details
-        owner = facade.get_user(place.owner_id)
-
-        return {
-            'id': place.id,
-            'title': place.title,
-            'description': place.description,
-            'price': place.price,
-            'latitude': place.latitude,
-            'longitude': place.longitude,
-            'owner': {
-                'id': owner.id,
-                'first_name': owner.first_name,
-                'last_name': owner.last_name,
-                'email': owner.email
-            },
-        }, 201
+        try:
+            place = facade.create_place(place_data)
+        except ValueError as e:
+            return {'error': str(e)}, 400
 
+        return serialize(Place, 'created', place), 201
+
+    @api.expect(place_list_parser)
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(304, 'List unchanged since the given ETag')
+    @api.response(400, 'Invalid cursor, price range or sort')
+    @cached_response('Place')
     def get(self):
         """
-        Retrieve a list of all places
+        Retrieve one page of places
+
+        min_price and max_price bound the price per night, amenities
+        keeps the places offering every listed amenity, sort orders
+        the places. The cursor of the next page is sent in the
+        X-Next-Cursor header and must be reused with the same filters.
+        With stream=json|ndjson every matching place is sent at once.
 
         In view of the changes to the expected output in the
         instructions, the fields that are not
         currently required are commented on.
         """
-        places = facade.get_all_places()
-        return [{
-            'id': place.id,
-            'title': place.title,
-            # 'description': place.description,
-            'price': place.price,
-            # 'latitude': place.latitude,
-            # 'longitude': place.longitude,
-            # 'owner': place.owner,
-            # 'amenities': place.amenities
-        } for place in places], 200
+        args = place_list_parser.parse_args()
+        limit, cursor = page_args(args=args)
+        amenity_ids = [amenity_id.strip()
+                       for amenity_id in (args['amenities'] or '').split(',')
+                       if amenity_id.strip()]
+        validators = list_validators(facade.get_places_version(amenity_ids))
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
+        columns = ('title', 'price', 'review_count', 'rating_sum')
+        filters = dict(min_price=args['min_price'], max_price=args['max_price'],
+                       sort=args['sort'], amenity_ids=amenity_ids)
+        try:
+            if args['stream']:
+                places = facade.stream_places(
+                    columns, batch_size=current_app.config['STREAM_BATCH_SIZE'], **filters)
+                return stream_response(places, serializer(Place, 'list'),
+                                       args['stream'], validators)
+            places, next_cursor = facade.get_places_page(limit, cursor, columns, **filters)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return serialize_many(Place, 'list', places), 200, \
+            {**page_headers(next_cursor), **validators}
+
+
+@api.route('/bulk')
+class PlaceBulk(Resource):
+    @api.expect([place_bulk_model])
+    @api.response(200, 'Bulk import processed, see per-row results')
+    @api.response(400, 'Invalid input data')
+    @jwt_required()
+    def post(self):
+        """
+        Register many places at once
+
+        The body is a JSON array or NDJSON (application/x-ndjson).
+        Admins may set owner_id on each row, otherwise the caller
+        owns every place. Valid rows are inserted in one transaction.
+        """
+        current_user = get_jwt_identity()
+        is_admin = current_user.get('is_admin', False)
+
+        try:
+            rows = read_bulk_payload()
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        valid, errors = validate_rows(place_bulk_model, rows)
+
+        places_data = []
+        for index, row in valid:
+            place_data = {key: row[key] for key in place_bulk_model if key in row}
+            if not is_admin or not place_data.get('owner_id'):
+                place_data['owner_id'] = current_user["id"]
+            place_data['price'] = round(place_data['price'], 2)
+            places_data.append((index, place_data))
+
+        # Check every owner with a single query
+        owner_ids = facade.get_existing_user_ids(
+            {place_data['owner_id'] for _, place_data in places_data})
+        accepted = []
+        for index, place_data in places_data:
+            if place_data['owner_id'] in owner_ids:
+                accepted.append((index, place_data))
+            else:
+                errors[index] = {'owner_id': 'The given owner UUID does not exist'}
+
+        try:
+            places = facade.create_places_bulk(
+                [place_data for _, place_data in accepted],
+                chunk_size=current_app.config['BULK_CHUNK_SIZE'])
+        except SQLAlchemyError:
+            return {'error': 'Bulk insert failed, no place was created'}, 400
+
+        created = {index: place.id for (index, _), place in zip(accepted, places)}
+        return bulk_results(created, errors), 200
+
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    @api.expect(search_parser)
+    @api.response(200, 'Matching places retrieved successfully')
+    @api.response(400, 'Invalid search parameters')
+    @cached_response('Place')
+    def get(self):
+        """
+        Search places by text or by location
+
+        Either q (full-text search over titles and descriptions, best
+        matches first, paginated with X-Next-Cursor), lat, lng and
+        radius_km (results nearest first, with their distance) or a bbox
+        (min_lng,min_lat,max_lng,max_lat; a box with min_lng > max_lng
+        crosses the antimeridian).
+        """
+        args = search_parser.parse_args()
+        limit = args['limit'] or current_app.config['API_PAGE_SIZE']
+        limit = max(1, min(limit, current_app.config['API_MAX_PAGE_SIZE']))
+
+        if args['q'] is not None:
+            try:
+                hits, next_cursor = facade.search_places_text(
+                    args['q'], limit, args['cursor'], ('title', 'price'))
+            except ValueError as e:
+                return {'error': str(e)}, 400
+            return serialize_many(Place, 'match', hits), 200, page_headers(next_cursor)
+
+        if args['bbox']:
+            try:
+                bbox = _parse_bbox(args['bbox'])
+            except ValueError as e:
+                return {'error': str(e)}, 400
+            places = facade.search_places_in_bbox(bbox, limit, SEARCH_COLUMNS)
+            return serialize_many(Place, 'location', places), 200
+
+        lat, lng, radius_km = args['lat'], args['lng'], args['radius_km']
+        if lat is None or lng is None or radius_km is None:
+            return {'error': 'Provide lat, lng and radius_km, or bbox'}, 400
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            return {'error': 'lat/lng out of range'}, 400
+        if not 0 < radius_km <= current_app.config['GEO_MAX_RADIUS_KM']:
+            return {'error': 'radius_km must be between 0 and '
+                    f"{current_app.config['GEO_MAX_RADIUS_KM']}"}, 400
+
+        hits = facade.search_places_near(lat, lng, radius_km, limit, SEARCH_COLUMNS)
+        location = serializer(Place, 'location')
+        return [{**location(place), 'distance_km': round(distance, 3)}
+                for place, distance in hits], 200
 
 
 @api.route('/<place_id>')
 class PlaceResource(Resource):
     @api.response(200, 'Place details retrieved successfully')
+    @api.response(304, 'Place unchanged since the given ETag or date')
     @api.response(404, 'Place not found')
+    @cached_response('Place:{place_id}', lambda place: [f"User:{place['owner']['id']}"])
     def get(self, place_id):
         """
         Get place details by ID
@@ -138,30 +315,15 @@ class PlaceResource(Resource):
         instructions, the fields that are not
         currently required are commented on.
         """
+        validators = detail_validators(facade.get_place_version(place_id))
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
 
-        place = facade.get_place(place_id)
+        place = facade.get_place(place_id, plan='detail')
         if place:
-            # Fetch owner details using the owner_id
-            owner = facade.get_user(place.owner_id)  # Use 'owner_id'
-
-            # Prepare owner data
-            owner_data = {
-                'id': owner.id,
-                'first_name': owner.first_name,
-                'last_name': owner.last_name,
-                'email': owner.email
-            }
-
-            return {
-                'id': place.id,
-                'title': place.title,
-                'description': place.description,
-                'price': place.price,
-                'latitude': place.latitude,
-                'longitude': place.longitude,
-                'owner': owner_data,  # Include owner details
-                # 'amenities': place.amenities
-            }, 200
+            # Owner is loaded with the place
+            return serialize(Place, 'detail', place), 200, validators
 
         return {'message': 'Place not found'}, 404
 
@@ -1,6 +1,15 @@
+from flask import current_app
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.exc import SQLAlchemyError
 from app.services import facade
+from app.api.v1.pagination import page_args, page_headers
+from app.api.v1.bulk import read_bulk_payload, validate_rows, bulk_results
+from app.api.v1.caching import cached_response
+from app.api.v1.conditional import detail_validators, list_validators, not_modified
+from app.api.v1.serializers import serialize, serialize_many, serializer
+from app.api.v1.streaming import list_parser, stream_response
+from app.models.review import Review
 
 api = Namespace("reviews", description="Review operations")
 places_reviews_ns = Namespace("places",
@@ -71,39 +80,107 @@ class ReviewList(Resource):
         # Create the review
         new_review = facade.create_review(review_data)
 
-        return {
-            "id": new_review.id,
-            "text": new_review.text,
-            "rating": new_review.rating,
-            "user_id": new_review.user_id,
-            "place_id": new_review.place_id
-        }, 201
+        return serialize(Review, "detail", new_review), 201
 
+    @api.expect(list_parser)
     @api.response(200, "List of reviews retrieved successfully")
+    @api.response(304, "List unchanged since the given ETag")
+    @api.response(400, "Invalid cursor")
+    @cached_response("Review")
     def get(self):
         """
-        Get the list of all reviews
+        Get one page of reviews, or every review with stream=json|ndjson
 
         Returns:
             tuple: A tuple containing:
                 - list: A list of dictionnaries, each containing review data
                 - int: HTTP status code 200 for success
+                - dict: X-Next-Cursor header when another page exists
         """
-        reviews = facade.get_all_reviews()
-        return [
-            {
-                "id": review_item.id,
-                "text": review_item.text,
-                "rating": review_item.rating,
-            }
-            for review_item in reviews
-        ], 200
+        args = list_parser.parse_args()
+        limit, cursor = page_args(args=args)
+        validators = list_validators(facade.get_reviews_version())
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
+        stream = args["stream"]
+        if stream:
+            reviews = facade.stream_reviews(("text", "rating"),
+                                            current_app.config["STREAM_BATCH_SIZE"])
+            return stream_response(reviews, serializer(Review, "summary"), stream,
+                                   validators)
+        try:
+            reviews, next_cursor = facade.get_reviews_page(
+                limit, cursor, columns=("text", "rating"))
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return serialize_many(Review, "summary", reviews), 200, \
+            {**page_headers(next_cursor), **validators}
+
+
+@api.route("/bulk")
+class ReviewBulk(Resource):
+    @api.expect([review_model])
+    @api.response(200, "Bulk import processed, see per-row results")
+    @api.response(400, "Invalid input data")
+    @jwt_required()
+    def post(self):
+        """
+        Register many reviews at once
+
+        The body is a JSON array or NDJSON (application/x-ndjson).
+        Admins may set user_id on each row, otherwise the caller
+        authors every review. Valid rows are inserted in one transaction.
+        """
+        current_user = get_jwt_identity()
+        is_admin = current_user.get("is_admin", False)
+
+        try:
+            rows = read_bulk_payload()
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        for row in rows:
+            if isinstance(row, dict) and (not is_admin or not row.get("user_id")):
+                row["user_id"] = current_user["id"]
+
+        valid, errors = validate_rows(review_model, rows)
+
+        # Check every place and author with a single query each
+        place_ids = facade.get_existing_place_ids(
+            {row["place_id"] for _, row in valid})
+        user_ids = facade.get_existing_user_ids(
+            {row["user_id"] for _, row in valid})
+
+        accepted = []
+        for index, row in valid:
+            if row["text"].isspace() or not row["text"]:
+                errors[index] = {"text": "Text of the review cannot be empty"}
+            elif row["place_id"] not in place_ids:
+                errors[index] = {"place_id": "The given place UUID does not exist"}
+            elif row["user_id"] not in user_ids:
+                errors[index] = {"user_id": "The given user UUID does not exist"}
+            else:
+                accepted.append(
+                    (index, {key: row[key] for key in review_model}))
+
+        try:
+            reviews = facade.create_reviews_bulk(
+                [review_data for _, review_data in accepted],
+                chunk_size=current_app.config["BULK_CHUNK_SIZE"])
+        except SQLAlchemyError:
+            return {"error": "Bulk insert failed, no review was created"}, 400
+
+        created = {index: review.id for (index, _), review in zip(accepted, reviews)}
+        return bulk_results(created, errors), 200
 
 
 @api.route("/<review_id>")
 class ReviewResource(Resource):
     @api.response(200, "Review details retrieved successfully")
+    @api.response(304, "Review unchanged since the given ETag or date")
     @api.response(404, "Review not found")
+    @cached_response("Review:{review_id}")
     def get(self, review_id):
         """
         Get review details by ID.
@@ -117,16 +194,14 @@ class ReviewResource(Resource):
                 or an error message.
                 - int: HTTP status code (200 if successful, 404 if not found)
         """
+        validators = detail_validators(facade.get_review_version(review_id))
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
         review = facade.get_review(review_id)
         if not review:
             return {"error": "Review not found"}, 404
-        return {
-            "id": review.id,
-            "text": review.text,
-            "rating": review.rating,
-            "user_id": review.user_id,
-            "place_id": review.place_id
-        }, 200
+        return serialize(Review, "detail", review), 200, validators
 
     @api.expect(review_update_model, validate=True)
     @api.response(200, "Review updated successfully")
@@ -210,7 +285,9 @@ class ReviewResource(Resource):
 @places_reviews_ns.route("/<place_id>/reviews")
 class PlaceReviewList(Resource):
     @api.response(200, "List of reviews for the place retrieved successfully")
+    @api.response(304, "List unchanged since the given ETag")
     @api.response(404, "Place not found")
+    @cached_response("Place:{place_id}")
     def get(self, place_id):
         """
         Get all reviews for a specific place
@@ -224,17 +301,16 @@ class PlaceReviewList(Resource):
                 - int: HTTP status code
                 (200 if successful, 404 if error)
         """
+        if facade.get_place_version(place_id) is None:
+            return {"error": "Place not found"}, 404
 
-        place = facade.get_place(place_id)
+        validators = list_validators(facade.get_reviews_version(place_id))
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
+
+        place = facade.get_place(place_id, plan="reviews")
         if not place:
             return {"error": "Place not found"}, 404
 
-        reviews_data = []
-        for review in place.reviews:
-            reviews_data.append({
-                "id": review.id,
-                "text": review.text,
-                "rating": review.rating,
-            })
-
-        return reviews_data, 200
+        return serialize_many(Review, "summary", place.reviews), 200, validators
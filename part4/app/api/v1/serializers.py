@@ -0,0 +1,137 @@
+"""
+Compiled response serializers and JSON encoding
+
+Every response shape is registered once as a (model, view) pair with
+its list of fields. The list is compiled into a plain function that
+builds the dict with direct attribute reads, so serializing a page of
+rows does no per-field lookups. Serializers read attributes only and
+work on entities as well as on the column rows of projected queries.
+
+Responses are encoded with orjson when it is installed and JSON_ENCODER
+is 'orjson' (the default), otherwise with the standard library.
+"""
+
+import json
+from flask import current_app, make_response
+from app.models.user import User
+from app.models.amenity import Amenity
+from app.models.place import Place, average_rating
+from app.models.review import Review
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+_serializers = {}
+
+
+def _compile(name, fields):
+    """
+    Generate `def name(obj): return {...}` for the given fields
+    """
+    namespace, items = {}, []
+    for index, field in enumerate(fields):
+        key, source = (field, field) if isinstance(field, str) else field
+        if callable(source):
+            namespace[f'_field{index}'] = source
+            items.append(f'{key!r}: _field{index}(obj)')
+        elif source.isidentifier():
+            items.append(f'{key!r}: obj.{source}')
+        else:
+            raise ValueError(f"Invalid attribute name {source!r}")
+    code = f"def {name}(obj):\n    return {{{', '.join(items)}}}\n"
+    exec(compile(code, f'<serializer {name}>', 'exec'), namespace)
+    return namespace[name]
+
+
+def register(model, view, fields):
+    """
+    Register the `view` shape of a model
+
+    Args:
+        model (class): the model the shape describes
+        view (string): name of the shape (e.g. 'list', 'detail')
+        fields (list): attribute names, or (key, source) pairs where
+            source is an attribute name or a callable(obj)
+    """
+    name = f'serialize_{model.__name__.lower()}_{view}'
+    _serializers[(model, view)] = _compile(name, fields)
+
+
+def serializer(model, view):
+    """
+    Return the compiled function of a registered shape
+    """
+    return _serializers[(model, view)]
+
+
+def serialize(model, view, obj):
+    return _serializers[(model, view)](obj)
+
+
+def serialize_many(model, view, objs):
+    function = _serializers[(model, view)]
+    return [function(obj) for obj in objs]
+
+
+def nested(model, view, attribute):
+    """
+    Field source serializing a related object (None stays None)
+    """
+    def serialize_related(obj):
+        related = getattr(obj, attribute)
+        return None if related is None else _serializers[(model, view)](related)
+    return serialize_related
+
+
+def encode(data):
+    """
+    Encode a response body to JSON bytes with the configured backend
+    """
+    if orjson is not None and current_app.config.get('JSON_ENCODER', 'orjson') == 'orjson':
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits: let json handle them
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def output_json(data, code, headers=None):
+    """
+    Flask-RESTX representation for application/json
+    """
+    response = make_response(encode(data), code)
+    response.headers.extend(headers or {})
+    response.mimetype = 'application/json'
+    return response
+
+
+# Response shapes
+
+register(User, 'detail', ['id', 'first_name', 'last_name', 'email'])
+
+register(Amenity, 'detail', ['id', 'name'])
+
+register(Place, 'list', [
+    'id', 'title', 'price', 'review_count',
+    ('average_rating', lambda row: average_rating(row.rating_sum, row.review_count)),
+])
+register(Place, 'detail', [
+    'id', 'title', 'description', 'price', 'latitude', 'longitude',
+    ('owner', nested(User, 'detail', 'user')),
+    'review_count', 'average_rating', 'rating_histogram',
+])
+register(Place, 'created', [
+    'id', 'title', 'description', 'price', 'latitude', 'longitude',
+    ('owner', nested(User, 'detail', 'user')),
+])
+register(Place, 'summary', ['id', 'title', 'price'])
+register(Place, 'location', ['id', 'title', 'price', 'latitude', 'longitude'])
+register(Place, 'match', [
+    'id', 'title', 'price',
+    ('score', lambda row: round(-row.score, 6)),  # BM25, higher is better
+])
+
+register(Review, 'detail', ['id', 'text', 'rating', 'user_id', 'place_id'])
+register(Review, 'summary', ['id', 'text', 'rating'])
@@ -0,0 +1,32 @@
+""" Runtime statistics for operators (admin only) """
+
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_restx import Namespace, Resource
+from app.persistence.engine import pool_stats
+from app.persistence.cache import object_cache, response_cache
+from app.persistence.amenity_index import amenity_index
+from app.passwords import password_hasher
+from app.services import facade
+
+api = Namespace('stats', description='Runtime statistics')
+
+
+@api.route('/')
+class Stats(Resource):
+    @api.response(200, 'Statistics retrieved successfully')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def get(self):
+        """Connection pool, cache, index and password hashing statistics"""
+        current_user = get_jwt_identity()
+        if not current_user.get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+
+        return {
+            'db_pool': pool_stats(),
+            'object_cache': object_cache.stats(),
+            'response_cache': response_cache.stats(),
+            'amenity_index': amenity_index.stats(),
+            'password_hasher': password_hasher.stats(),
+            'password_costs': facade.get_password_costs(),
+        }, 200
@@ -0,0 +1,53 @@
+""" Streamed list responses: the whole collection as a JSON array or NDJSON """
+
+from itertools import islice
+from flask import Response, current_app, stream_with_context
+from app.api.v1.pagination import pagination_parser
+from app.api.v1.serializers import encode
+
+NDJSON = 'application/x-ndjson'
+
+# List endpoints accepting ?stream= on top of paging
+list_parser = pagination_parser.copy()
+list_parser.add_argument(
+    'stream', type=str, location='args', choices=('json', 'ndjson'),
+    help='Send every item at once as a chunked JSON array or NDJSON '
+         '(limit and cursor are ignored)')
+
+
+def stream_response(rows, serialize_row, fmt, headers=None):
+    """
+    Stream rows as they are fetched
+
+    Encoded items are sent in chunks of STREAM_BATCH_SIZE, so memory
+    stays constant and the first bytes leave before the query is done.
+
+    Args:
+        rows (iterator): rows to send, read lazily
+        serialize_row (function): compiled serializer of one row
+        fmt (string): 'json' (one array) or 'ndjson' (one item per line)
+        headers (dict): extra response headers
+    """
+    batch_size = current_app.config['STREAM_BATCH_SIZE']
+
+    def generate():
+        if fmt == 'json':
+            yield b'['
+        separator = b'\n' if fmt == 'ndjson' else b','
+        first = True
+        rows_iter = iter(rows)
+        while True:
+            batch = [encode(serialize_row(row)) for row in islice(rows_iter, batch_size)]
+            if not batch:
+                break
+            chunk = separator.join(batch)
+            if fmt == 'ndjson':
+                yield chunk + b'\n'
+            else:
+                yield chunk if first else b',' + chunk
+            first = False
+        if fmt == 'json':
+            yield b']'
+
+    return Response(stream_with_context(generate()), headers=headers,
+                    mimetype=NDJSON if fmt == 'ndjson' else 'application/json')
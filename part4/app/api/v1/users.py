@@ -1,6 +1,14 @@
+from flask import current_app
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.api.v1.pagination import page_args, page_headers
+from app.api.v1.caching import cached_response
+from app.api.v1.conditional import detail_validators, list_validators, not_modified
+from app.api.v1.serializers import serialize, serialize_many, serializer
+from app.api.v1.streaming import list_parser, stream_response
+from app.models.user import User
+from app.passwords import password_hasher
 
 
 api = Namespace('users', description='User operations')
@@ -51,6 +59,7 @@ class UserList(Resource):
     @api.response(201, 'User successfully created')
     @api.response(400, 'Email already registered')
     @api.response(400, 'Invalid input data')
+    @api.response(503, 'Too many password operations in progress')
     @jwt_required()
     def post(self):
         """
@@ -82,32 +91,47 @@ class UserList(Resource):
             'message': 'User created successfully'
         }, 201
 
+    @api.expect(list_parser)
     @api.response(200, 'List of users retrieved successfully')
+    @api.response(304, 'List unchanged since the given ETag')
+    @api.response(400, 'Invalid cursor')
+    @cached_response('User')
     def get(self):
         """
-        Get the list of all users
+        Get one page of users, or every user with stream=json|ndjson
 
         Returns:
             tuple: A tuple containing:
                 - list: A list of dictionnaries, each containing user data
                 - int: HTTP status code 200 for success
+                - dict: X-Next-Cursor header when another page exists
         """
-        users = facade.get_all_users()
-        return [
-            {
-                'id': user_item.id,
-                'first_name': user_item.first_name,
-                'last_name': user_item.last_name,
-                'email': user_item.email
-            }
-            for user_item in users
-        ], 200
+        args = list_parser.parse_args()
+        limit, cursor = page_args(args=args)
+        validators = list_validators(facade.get_users_version())
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
+        stream = args['stream']
+        if stream:
+            users = facade.stream_users(('first_name', 'last_name', 'email'),
+                                        current_app.config['STREAM_BATCH_SIZE'])
+            return stream_response(users, serializer(User, 'detail'), stream, validators)
+        try:
+            users, next_cursor = facade.get_users_page(
+                limit, cursor, columns=('first_name', 'last_name', 'email'))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return serialize_many(User, 'detail', users), 200, \
+            {**page_headers(next_cursor), **validators}
 
 
 @api.route('/<user_id>')
 class UserResource(Resource):
     @api.response(200, 'User details retrieved successfully')
+    @api.response(304, 'User unchanged since the given ETag or date')
     @api.response(404, 'User not found')
+    @cached_response('User:{user_id}')
     def get(self, user_id):
         """
         Get user details by ID.
@@ -121,19 +145,20 @@ class UserResource(Resource):
                 or an error message.
                 - int: HTTP status code (200 if successful, 404 if not found)
         """
+        validators = detail_validators(facade.get_user_version(user_id))
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
         user = facade.get_user(user_id)
         if not user:
             return {'error': 'User not found'}, 404
-        return {
-            'id': user.id,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'email': user.email}, 200
+        return serialize(User, 'detail', user), 200, validators
 
     @api.expect(user_model_update, validate=True)
     @api.response(200, "User succeffuly updated")
     @api.response(404, "User not found")
     @api.response(400, "Invalid input data")
+    @api.response(503, "Too many password operations in progress")
     @jwt_required()
     def put(self, user_id):
         """
@@ -157,8 +182,6 @@ class UserResource(Resource):
                 - int: HTTP status code
                     (200 if successful, 400 or 404 if there is an error).
         """
-        from app import bcrypt
-
         # Catch UUID from JWT and data
         current_user = get_jwt_identity()
         user_data = api.payload
@@ -173,18 +196,10 @@ class UserResource(Resource):
 
         # Hash the new password
         if "password" in user_data:
-            hashed_password = bcrypt.generate_password_hash(
-                user_data["password"]
-            ).decode('utf-8')
-            user_data["password"] = hashed_password
+            user_data["password"] = password_hasher.hash(user_data["password"])
 
         user = facade.update_user(user_id, user_data)
         if not user:
             return {"error": "User not found"}, 404
         else:
-            return {
-                    "id": user.id,
-                    "first_name": user.first_name,
-                    "last_name": user.last_name,
-                    "email": user.email
-                }, 200
+            return serialize(User, 'detail', user), 200
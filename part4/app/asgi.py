@@ -0,0 +1,54 @@
+"""
+ASGI adapter of the application
+
+The same Flask application, with the same v1 routes, served by an
+asyncio server such as uvicorn. The event loop owns the sockets, so
+idle keep-alive connections cost no thread. bcrypt already runs in the
+password hasher's worker processes, so a login holds a thread only
+while it waits for them.
+
+The views are still WSGI: each request holds one pool thread until
+its whole body is sent, slow clients included, since the thread blocks
+while the send queue is full. Streamed lists (?stream=, which can last
+as long as a download) therefore get their own pool of
+ASGI_STREAM_THREADS, so slow downloads cannot take the ASGI_THREADS
+the other routes answer on.
+
+Requires the optional a2wsgi package.
+"""
+
+from urllib.parse import parse_qs
+from app import create_app
+
+try:
+    from a2wsgi import WSGIMiddleware
+except ImportError:  # optional dependency
+    WSGIMiddleware = None
+
+
+def _is_stream(scope):
+    """True for a request asking for a streamed list"""
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    return bool(query.get('stream', [''])[0])
+
+
+def create_asgi_app(config_class="config.DevelopmentConfig"):
+    """
+    Return the ASGI application wrapping create_app(config_class)
+
+    Raises:
+        RuntimeError: if a2wsgi is not installed
+    """
+    if WSGIMiddleware is None:
+        raise RuntimeError("ASGI serving requires a2wsgi: pip install a2wsgi uvicorn")
+    flask_app = create_app(config_class)
+    views = WSGIMiddleware(flask_app, workers=flask_app.config['ASGI_THREADS'])
+    streams = WSGIMiddleware(flask_app, workers=flask_app.config['ASGI_STREAM_THREADS'])
+
+    async def app(scope, receive, send):
+        if scope['type'] == 'http' and _is_stream(scope):
+            await streams(scope, receive, send)
+        else:
+            await views(scope, receive, send)
+
+    return app
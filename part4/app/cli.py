@@ -0,0 +1,97 @@
+""" Maintenance commands, available as `flask hbnb <command>` """
+
+import click
+from flask.cli import AppGroup
+from flask import current_app
+from app.persistence import dump, migrations, query_plans
+from app.services import facade
+
+hbnb_cli = AppGroup('hbnb', help='HBnB maintenance commands')
+
+
+@hbnb_cli.command('migrate')
+@click.option('--target', type=int, default=None,
+              help='Stop at this version (default: latest)')
+def migrate(target):
+    """Apply pending schema migrations"""
+    applied = migrations.upgrade(target)
+    if applied:
+        click.echo(f"Applied migrations: {', '.join(map(str, applied))}")
+    else:
+        click.echo("Database already up to date")
+    click.echo(f"Schema version: {migrations.current_version()}")
+
+
+@hbnb_cli.command('migrate-status')
+def migrate_status():
+    """List migrations and whether they are applied"""
+    for version, description, applied_at in migrations.status():
+        state = f"applied {applied_at}" if applied_at else "pending"
+        click.echo(f"{version:>4}  {description:<60} {state}")
+    for problem in migrations.schema_drift():
+        click.echo(f"drift: {problem}", err=True)
+
+
+@hbnb_cli.command('explain')
+def explain():
+    """Show which index each facade query uses"""
+    for name, (uses_index, plan) in query_plans.index_report().items():
+        click.echo(f"{'index' if uses_index else 'SCAN ':<6} {name}")
+        for line in plan:
+            click.echo(f"         {line}")
+
+
+@hbnb_cli.command('rebuild-ratings')
+def rebuild_ratings():
+    """Recompute the rating aggregates of every place"""
+    count = facade.rebuild_rating_aggregates()
+    click.echo(f"Rebuilt rating aggregates of {count} places")
+
+
+@hbnb_cli.command('reindex-search')
+def reindex_search():
+    """Rebuild the full-text index of place titles and descriptions"""
+    count = facade.rebuild_search_index()
+    click.echo(f"Indexed {count} places for full-text search")
+
+
+def _report(table, rows, elapsed, done):
+    rate = rows / elapsed if elapsed else 0
+    line = f"{table:<14} {rows:>12,} rows  {elapsed:>8.1f} s  {rate:>10,.0f} rows/s"
+    click.echo(line if done else f"{line}  ...", err=not done)
+
+
+@hbnb_cli.command('export')
+@click.argument('directory', type=click.Path(file_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(dump.FORMATS), default='ndjson',
+              show_default=True, help='File format, one file per table')
+@click.option('--batch-size', type=int, default=None,
+              help='Rows fetched per round trip (default: BULK_CHUNK_SIZE)')
+def export_catalog(directory, fmt, batch_size):
+    """Dump users, amenities, places, their links and reviews"""
+    counts = dump.export_tables(
+        directory, fmt, batch_size or current_app.config['BULK_CHUNK_SIZE'], _report)
+    click.echo(f"Exported {sum(counts.values()):,} rows to {directory}")
+
+
+@hbnb_cli.command('import')
+@click.argument('directory', type=click.Path(exists=True, file_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(dump.FORMATS), default='ndjson',
+              show_default=True, help='Format of the table files')
+@click.option('--batch-size', type=int, default=None,
+              help='Rows per INSERT and commit (default: BULK_CHUNK_SIZE)')
+@click.option('--rebuild-ratings', is_flag=True,
+              help='Recompute the rating aggregates, when merging into existing data')
+def import_catalog(directory, fmt, batch_size, rebuild_ratings):
+    """Load a dump written by `flask hbnb export`, skipping existing rows"""
+    try:
+        counts = dump.import_tables(
+            directory, fmt, batch_size or current_app.config['BULK_CHUNK_SIZE'], _report)
+    except ValueError as error:
+        raise click.ClickException(str(error))
+    click.echo(f"Imported {sum(counts.values()):,} rows from {directory}")
+    if rebuild_ratings:
+        click.echo(f"Rebuilt rating aggregates of {facade.rebuild_rating_aggregates()} places")
+    # The full-text index is not part of the dump
+    if 'places' in counts and facade.place_search.available():
+        click.echo(f"Indexed {facade.rebuild_search_index()} places for full-text search")
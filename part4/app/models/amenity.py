@@ -5,13 +5,35 @@ Module for amenity
 
 from app.extensions import db
 from .base_model import BaseModel
+from sqlalchemy import Index, event
 from sqlalchemy.orm import relationship
 
 
+def normalize_name(name):
+    """
+    Case and whitespace insensitive form of an amenity name
+    """
+    return ' '.join(name.split()).casefold()
+
+
 class Amenity(BaseModel):
     __tablename__ = 'amenities'
 
     name = db.Column(db.String(100), nullable=False, unique=True)
-    places = relationship('Place', secondary='place_amenity', lazy='subquery',  # Many-to-Many with Place
+    name_key = db.Column(db.String(100), nullable=True)  # normalize_name(name)
+    places = relationship('Place', secondary='place_amenity', lazy='select',  # Many-to-Many with Place, loaded on demand
                            backref=db.backref('associated_amenities', lazy=True, overlaps="associated_places"),
                            overlaps="associated_places,amenities")  # Refined overlaps
+
+
+# "WiFi" and " wifi " are the same amenity: the database enforces it
+Index('ux_amenities_name_key', Amenity.name_key, unique=True)
+
+
+@event.listens_for(Amenity, 'before_insert')
+@event.listens_for(Amenity, 'before_update')
+def _sync_name_key(mapper, connection, amenity):
+    """
+    Keep the normalized name in step with the name
+    """
+    amenity.name_key = normalize_name(amenity.name)
@@ -4,6 +4,7 @@ BaseModel class that defines all common attributes/methods for other classes
 """
 
 from app.extensions import db
+from sqlalchemy.orm import declared_attr
 import uuid
 from datetime import datetime
 
@@ -15,13 +16,21 @@ class BaseModel(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    @declared_attr
+    def __table_args__(cls):
+        # Keyset pagination walks every table in (created_at, id) order;
+        # max(updated_at) versions the table for conditional GETs
+        return (db.Index(f'ix_{cls.__tablename__}_created_at_id', 'created_at', 'id'),
+                db.Index(f'ix_{cls.__tablename__}_updated_at', 'updated_at'))
+
     def save(self):
         """
-        Update the updated_at timestamp and persist changes to the database.
+        Update the updated_at timestamp and flush changes to the database.
+        The commit is left to the unit of work.
         """
         self.updated_at = datetime.utcnow()
         db.session.add(self)
-        db.session.commit()
+        db.session.flush()
 
     def update(self, data):
         """
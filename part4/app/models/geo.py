@@ -0,0 +1,87 @@
+"""
+Fixed latitude/longitude grid used to index places spatially
+
+The globe is cut into CELL_DEGREES x CELL_DEGREES cells numbered row by
+row, so the cells of one grid row form a contiguous integer range and a
+bounding box maps to one `geo_cell BETWEEN lo AND hi` range per row.
+"""
+
+import math
+
+CELL_DEGREES = 0.1
+ROWS = 1800   # 180 / CELL_DEGREES
+COLS = 3600   # 360 / CELL_DEGREES
+# Above this many grid rows, scan one wider range and filter exactly
+MAX_CELL_RANGES = 64
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+
+def _row(latitude):
+    return min(int((latitude + 90) / CELL_DEGREES), ROWS - 1)
+
+
+def _col(longitude):
+    return min(int((longitude + 180) / CELL_DEGREES), COLS - 1)
+
+
+def geo_cell(latitude, longitude):
+    """
+    Grid cell number of a coordinate (None if either is missing)
+    """
+    if latitude is None or longitude is None:
+        return None
+    return _row(latitude) * COLS + _col(longitude)
+
+
+def longitude_spans(min_lng, max_lng):
+    """
+    Split a longitude interval crossing the antimeridian in two
+    """
+    if min_lng <= max_lng:
+        return [(min_lng, max_lng)]
+    return [(min_lng, 180.0), (-180.0, max_lng)]
+
+
+def cell_ranges(min_lat, min_lng, max_lat, max_lng):
+    """
+    Inclusive (lo, hi) geo_cell ranges covering a bounding box
+    """
+    first_row, last_row = _row(min_lat), _row(max_lat)
+    ranges = []
+    for west, east in longitude_spans(min_lng, max_lng):
+        first_col, last_col = _col(west), _col(east)
+        if last_row - first_row >= MAX_CELL_RANGES:
+            ranges.append((first_row * COLS + first_col, last_row * COLS + last_col))
+            continue
+        for row in range(first_row, last_row + 1):
+            ranges.append((row * COLS + first_col, row * COLS + last_col))
+    return ranges
+
+
+def bbox_around(latitude, longitude, radius_km):
+    """
+    Smallest (min_lat, min_lng, max_lat, max_lng) box containing the circle
+    """
+    dlat = radius_km / KM_PER_DEGREE
+    min_lat, max_lat = max(latitude - dlat, -90.0), min(latitude + dlat, 90.0)
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return min_lat, -180.0, max_lat, 180.0
+    dlng = radius_km / (KM_PER_DEGREE * math.cos(math.radians(latitude)))
+    if dlng >= 180.0:
+        return min_lat, -180.0, max_lat, 180.0
+    min_lng = (longitude - dlng + 180.0) % 360.0 - 180.0
+    max_lng = (longitude + dlng + 180.0) % 360.0 - 180.0
+    return min_lat, min_lng, max_lat, max_lng
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """
+    Great-circle distance between two coordinates, in kilometres
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + \
+        math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
@@ -6,16 +6,28 @@ Module for place
 from app.extensions import db
 from .base_model import BaseModel
 from sqlalchemy.orm import relationship
-from sqlalchemy import Table, Column, ForeignKey
+from sqlalchemy import Table, Column, ForeignKey, Index, event
+from . import geo
 
 # Association table for Place and Amenity
 place_amenity = Table(
     'place_amenity',
     db.Model.metadata,
     Column('place_id', db.String(36), ForeignKey('places.id'), primary_key=True),
-    Column('amenity_id', db.String(36), ForeignKey('amenities.id'), primary_key=True)
+    Column('amenity_id', db.String(36), ForeignKey('amenities.id'), primary_key=True),
+    Index('ix_place_amenity_amenity_id', 'amenity_id')  # Reverse lookups (amenity -> places)
 )
 
+RATINGS = range(1, 6)
+
+
+def average_rating(rating_sum, review_count):
+    """
+    Average rating from the denormalized aggregates (None without reviews)
+    """
+    return round(rating_sum / review_count, 2) if review_count else None
+
+
 class Place(BaseModel):
     __tablename__ = 'places'
 
@@ -24,9 +36,40 @@ class Place(BaseModel):
     price = db.Column(db.Float, nullable=False)
     latitude = db.Column(db.Float, nullable=False)
     longitude = db.Column(db.Float, nullable=False)
-    owner_id = db.Column(db.String(36), ForeignKey('users.id'), nullable=False)  # Foreign key to User
+    owner_id = db.Column(db.String(36), ForeignKey('users.id'), nullable=False, index=True)  # Foreign key to User
+    geo_cell = db.Column(db.Integer, nullable=True, index=True)  # Spatial grid cell, see models/geo.py
     # Removed redundant user_id column
+    # Rating aggregates, maintained by the facade on every review write
+    review_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_1_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_2_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_3_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_4_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_5_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     reviews = relationship('Review', backref='place', lazy=True)  # One-to-Many with Review
-    amenities = relationship('Amenity', secondary=place_amenity, lazy='subquery',  # Many-to-Many with Amenity
+    amenities = relationship('Amenity', secondary=place_amenity, lazy='select',  # Many-to-Many with Amenity, loaded on demand
                               backref=db.backref('associated_places', lazy=True, overlaps="associated_amenities"),
                               overlaps="associated_amenities,places")  # Refined overlaps
+
+    @property
+    def average_rating(self):
+        return average_rating(self.rating_sum, self.review_count)
+
+    @property
+    def rating_histogram(self):
+        return {str(rating): getattr(self, f'rating_{rating}_count') or 0
+                for rating in RATINGS}
+
+
+# Price filters and price ordering (keyset on price, id)
+Index('ix_places_price_id', Place.price, Place.id)
+
+
+@event.listens_for(Place, 'before_insert')
+@event.listens_for(Place, 'before_update')
+def _sync_geo_cell(mapper, connection, place):
+    """
+    Keep the spatial grid cell in step with the coordinates
+    """
+    place.geo_cell = geo.geo_cell(place.latitude, place.longitude)
@@ -13,5 +13,5 @@ class Review(BaseModel):
 
     text = db.Column(db.Text, nullable=False)
     rating = db.Column(db.Integer, nullable=False)
-    user_id = db.Column(db.String(36), ForeignKey('users.id'), nullable=False)  # Foreign key to User
-    place_id = db.Column(db.String(36), ForeignKey('places.id'), nullable=False)  # Foreign key to Place
+    user_id = db.Column(db.String(36), ForeignKey('users.id'), nullable=False, index=True)  # Foreign key to User
+    place_id = db.Column(db.String(36), ForeignKey('places.id'), nullable=False, index=True)  # Foreign key to Place
@@ -3,7 +3,8 @@
 Module for User
 """
 
-from app.extensions import db, bcrypt
+from app.extensions import db
+from app.passwords import password_hasher
 from sqlalchemy.orm import relationship
 from .base_model import BaseModel
 
@@ -42,10 +43,17 @@ class User(BaseModel):
         """
         Hash the password before storing it.
         """
-        self.password = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password = password_hasher.hash(password)
 
     def verify_password(self, password):
         """
         Verify the hashed password.
         """
-        return bcrypt.check_password_hash(self.password, password)
+        return password_hasher.verify(self.password, password)
+
+    def password_needs_rehash(self):
+        """
+        True when the stored hash was made with another cost
+        than the configured one (e.g. BCRYPT_LOG_ROUNDS changed).
+        """
+        return password_hasher.needs_rehash(self.password)
@@ -0,0 +1,316 @@
+"""
+Password hashing service
+
+bcrypt is slow on purpose (hundreds of milliseconds of CPU per hash or
+check). Run on the request threads, a burst of logins occupies every
+worker of the process and every other endpoint waits behind it. Hashes
+and checks run in a pool of worker processes instead, so they spread
+over the CPUs; the request thread only waits for the result.
+
+At most PASSWORD_HASH_WORKERS jobs run and PASSWORD_HASH_MAX_QUEUE wait
+for a worker; past that, callers get PasswordHasherBusy immediately
+instead of piling up. A job not done after PASSWORD_HASH_TIMEOUT
+seconds is cancelled if it has not started yet, and keeps its place
+in the limit until it ends if it has.
+
+Each hash records its cost. When BCRYPT_LOG_ROUNDS changes, a login
+with an older cost is rehashed in the background (rehash_later), so
+accounts move to the new cost as their owners sign in.
+"""
+
+import logging
+import multiprocessing
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import bcrypt
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password operations are already queued"""
+
+
+class Hasher(ABC):
+    """
+    A password hashing scheme. Instances are sent to the worker
+    processes, so they must be picklable.
+    """
+    @classmethod
+    @abstractmethod
+    def from_config(cls, config):
+        pass
+
+    @abstractmethod
+    def hash(self, password):
+        pass
+
+    @abstractmethod
+    def verify(self, password_hash, password):
+        pass
+
+    @abstractmethod
+    def cost(self, password_hash):
+        """
+        Cost parameter a hash was made with (None if it is not
+        a hash of this scheme)
+        """
+
+    def needs_rehash(self, password_hash):
+        """
+        True when the hash was made with other cost parameters
+        than the configured ones
+        """
+        return self.cost(password_hash) != self.target_cost
+
+    @property
+    @abstractmethod
+    def target_cost(self):
+        pass
+
+    # Leading characters of a hash that hold the scheme and cost
+    cost_prefix_length = None
+
+
+class BcryptHasher(Hasher):
+    """
+    bcrypt with a cost of 2**rounds iterations (BCRYPT_LOG_ROUNDS)
+    """
+    cost_prefix_length = 7  # "$2b$12$"
+
+    def __init__(self, rounds=12):
+        self.rounds = rounds
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config.get('BCRYPT_LOG_ROUNDS', 12))
+
+    def hash(self, password):
+        hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(self.rounds))
+        return hashed.decode('utf-8')
+
+    def verify(self, password_hash, password):
+        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+    def cost(self, password_hash):
+        # $2b$<rounds>$<salt and checksum>
+        parts = password_hash.split('$')
+        if len(parts) < 4 or not parts[2].isdigit():
+            return None
+        return int(parts[2])
+
+    @property
+    def target_cost(self):
+        return self.rounds
+
+
+# Values accepted by the PASSWORD_HASHER setting
+HASHERS = {
+    'bcrypt': BcryptHasher,
+}
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+class _Timing:
+    """
+    Count and durations of one kind of operation
+    """
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.work = 0.0
+        self.max = 0.0
+
+    def record(self, elapsed, work):
+        self.count += 1
+        self.total += elapsed
+        self.work += work
+        self.max = max(self.max, elapsed)
+
+    def stats(self):
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            'avg_work_ms': round(self.work / self.count * 1000, 2) if self.count else 0.0,
+            'max_ms': round(self.max * 1000, 2),
+        }
+
+
+class PasswordHasher:
+    """
+    Hashes and checks passwords in a bounded pool of worker processes
+
+    The scheme is the PASSWORD_HASHER entry of HASHERS. With
+    PASSWORD_HASH_WORKERS = 0 the work runs on the calling thread
+    (tests, CLI), still subject to the queue limit.
+    """
+    def __init__(self):
+        self.hasher = BcryptHasher()
+        self.workers = 0
+        self.max_queue = 32
+        self.timeout = 10
+        self.rejected = 0
+        self.timed_out = 0
+        self.rehashed = 0
+        self.rehash_skipped = 0
+        self.max_pending_rehashes = 8
+        self._pending_rehashes = 0
+        self._executor = None
+        self._background = None
+        self._slots = threading.BoundedSemaphore(self.max_queue)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._timings = {'hash': _Timing(), 'verify': _Timing()}
+
+    def init_app(self, app):
+        self.hasher = HASHERS[app.config.get('PASSWORD_HASHER', 'bcrypt')] \
+            .from_config(app.config)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 0)
+        self.max_queue = app.config.get('PASSWORD_HASH_MAX_QUEUE', 32)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 10)
+        self.max_pending_rehashes = app.config.get('PASSWORD_REHASH_MAX_PENDING', 8)
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a multi-threaded server is not safe
+                self._executor = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def _run(self, operation, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy("Too many password operations in progress")
+        start = time.perf_counter()
+        with self._lock:
+            self._in_flight += 1
+        if not self.workers:
+            try:
+                result, work = _timed(*args)
+            finally:
+                self._release()
+        else:
+            try:
+                future = self._pool().submit(_timed, *args)
+            except BaseException:
+                self._release()
+                raise
+            # The slot is held until the job is really over, even after
+            # a timeout, so the pool never holds more than the limit
+            future.add_done_callback(self._release)
+            try:
+                result, work = future.result(self.timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                with self._lock:
+                    self.timed_out += 1
+                raise PasswordHasherBusy("Password operation timed out")
+        with self._lock:
+            self._timings[operation].record(time.perf_counter() - start, work)
+        return result
+
+    def _release(self, future=None):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def hash(self, password):
+        """
+        Return the hash of a password
+        """
+        return self._run('hash', self.hasher.hash, password)
+
+    def verify(self, password_hash, password):
+        """
+        Check a password against its hash
+        """
+        return self._run('verify', self.hasher.verify, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """
+        True when a hash does not use the configured cost
+        """
+        return self.hasher.needs_rehash(password_hash)
+
+    def cost(self, password_hash):
+        return self.hasher.cost(password_hash)
+
+    def rehash_later(self, password, store):
+        """
+        Hash a password at the configured cost on a background thread,
+        then call store(new_hash). Skipped when PASSWORD_REHASH_MAX_PENDING
+        rehashes already wait, or when the pool is saturated once it
+        runs: the next login tries again.
+
+        Returns:
+            Future: the scheduled rehash, None if it was skipped
+        """
+        with self._lock:
+            if self._pending_rehashes >= self.max_pending_rehashes:
+                self.rehash_skipped += 1
+                return None
+            self._pending_rehashes += 1
+            if self._background is None:
+                self._background = ThreadPoolExecutor(1, thread_name_prefix='rehash')
+            background = self._background
+        try:
+            return background.submit(self._rehash, password, store)
+        except BaseException:
+            with self._lock:
+                self._pending_rehashes -= 1
+            raise
+
+    def _rehash(self, password, store):
+        try:
+            store(self.hash(password))
+        except PasswordHasherBusy:
+            with self._lock:
+                self.rehash_skipped += 1
+        except Exception:
+            logger.exception("Password rehash failed")
+        else:
+            with self._lock:
+                self.rehashed += 1
+        finally:
+            with self._lock:
+                self._pending_rehashes -= 1
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            background, self._background = self._background, None
+        if background is not None:
+            background.shutdown()
+        if executor is not None:
+            executor.shutdown()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hasher': type(self.hasher).__name__,
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'in_flight': self._in_flight,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out,
+                'target_cost': self.hasher.target_cost,
+                'rehashed': self.rehashed,
+                'rehash_skipped': self.rehash_skipped,
+                'rehash_pending': self._pending_rehashes,
+                **{operation: timing.stats()
+                   for operation, timing in self._timings.items()},
+            }
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,249 @@
+"""
+In-process bitmap index of the place <-> amenity links
+
+Every place gets a bit position (its ordinal) and every amenity a bitmap
+holding the bits of the places linked to it, so "places having all of
+these amenities" is a bitwise AND of a few Python integers whatever the
+catalog size. The index is built from place_amenity on first use, kept
+in step with the links committed by this process, and rebuilt after
+AMENITY_INDEX_TTL seconds to pick up writes made by other processes.
+"""
+
+import json
+import threading
+import time
+from sqlalchemy import event, func, inspect, literal_column, select
+from app.extensions import db
+from app.models.amenity import Amenity
+from app.models.place import Place, place_amenity
+
+# Relationship attributes holding the links, on each side
+LINK_ATTRIBUTES = {
+    Place: ('amenities', 'associated_amenities'),
+    Amenity: ('places', 'associated_places'),
+}
+
+# Positions of the set bits of every byte value
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+
+class AmenityBitmapIndex:
+    """
+    Bitmaps of place ordinals per amenity
+    """
+    def __init__(self):
+        self.ttl = 300
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._built_at = None
+        self._ordinals = {}   # place id -> bit position
+        self._place_ids = []  # bit position -> place id (None once deleted)
+        self._bitmaps = {}    # amenity id -> int bitmap of place ordinals
+        self._replay = None   # changes committed while a rebuild runs
+
+    def init_app(self, app):
+        self.ttl = app.config.get('AMENITY_INDEX_TTL', 300)
+        # Links are applied once committed, dropped on rollback
+        for name, listener in (('after_flush', self._collect_changes),
+                               ('after_commit', self._apply_changes),
+                               ('after_rollback', self._discard_changes)):
+            if not event.contains(db.session, name, listener):
+                event.listen(db.session, name, listener)
+
+    def rebuild(self):
+        """
+        Reload every link from place_amenity
+
+        Bits are set in one bytearray per amenity and each is converted
+        to an integer once, so the build is linear in the number of links.
+
+        Returns:
+            int: number of links indexed
+        """
+        with self._rebuild_lock:
+            return self._rebuild()
+
+    def _rebuild(self):
+        with self._lock:
+            self._replay = []
+        try:
+            ordinals, place_ids, bitmaps, links = self._read_links()
+        except Exception:
+            with self._lock:
+                self._replay = None
+            raise
+        with self._lock:
+            self._ordinals, self._place_ids, self._bitmaps = ordinals, place_ids, bitmaps
+            self._built_at = time.monotonic()
+            # The links read may predate these commits
+            replay, self._replay = self._replay, None
+            for changes in replay:
+                self._apply(changes)
+        return links
+
+    @staticmethod
+    def _read_links():
+        ordinals, place_ids, bitmaps = {}, [], {}
+        links = 0
+        result = db.session.execute(
+            select(place_amenity.c.place_id, place_amenity.c.amenity_id)
+            .order_by(place_amenity.c.place_id)
+            .execution_options(yield_per=10000))
+        for place_id, amenity_id in result:
+            ordinal = ordinals.get(place_id)
+            if ordinal is None:
+                ordinal = ordinals[place_id] = len(place_ids)
+                place_ids.append(place_id)
+            bits = bitmaps.get(amenity_id)
+            if bits is None:
+                bits = bitmaps[amenity_id] = bytearray()
+            byte = ordinal >> 3
+            if byte >= len(bits):
+                bits.extend(bytes(byte + 1 - len(bits)))
+            bits[byte] |= 1 << (ordinal & 7)
+            links += 1
+        bitmaps = {amenity_id: int.from_bytes(bits, 'little')
+                   for amenity_id, bits in bitmaps.items()}
+        return ordinals, place_ids, bitmaps, links
+
+    def _expired(self):
+        return self._built_at is None or time.monotonic() - self._built_at > self.ttl
+
+    def _ensure_fresh(self):
+        """
+        One request rebuilds an expired index; the others keep reading
+        the previous snapshot meanwhile, or wait for the first build
+        """
+        if not self._expired():
+            return
+        if not self._rebuild_lock.acquire(blocking=self._built_at is None):
+            return
+        try:
+            if self._expired():
+                self._rebuild()
+        finally:
+            self._rebuild_lock.release()
+
+    def _matches(self, amenity_ids):
+        self._ensure_fresh()
+        with self._lock:
+            bitmaps = [self._bitmaps.get(str(amenity_id), 0)
+                       for amenity_id in set(amenity_ids)]
+            place_ids = self._place_ids
+        if not bitmaps:
+            return 0, place_ids
+        matches = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            matches &= bitmap
+        return matches, place_ids
+
+    def count_places_with_all(self, amenity_ids):
+        """
+        Return how many places are linked to every given amenity,
+        without listing them
+        """
+        return self._matches(amenity_ids)[0].bit_count()
+
+    def places_with_all(self, amenity_ids):
+        """
+        Return the ids of the places linked to every given amenity
+        """
+        matches, place_ids = self._matches(amenity_ids)
+        # Decoded a byte at a time: linear in the bitmap size
+        found = set()
+        data = matches.to_bytes((matches.bit_length() + 7) // 8, 'little')
+        for byte, value in enumerate(data):
+            if value:
+                for bit in _BYTE_BITS[value]:
+                    found.add(place_ids[byte * 8 + bit])
+        return found
+
+    def stats(self):
+        with self._lock:
+            return {
+                'places': len(self._ordinals),
+                'amenities': len(self._bitmaps),
+                'age_seconds': round(time.monotonic() - self._built_at, 1)
+                if self._built_at is not None else None,
+            }
+
+    # Maintenance
+
+    def _collect_changes(self, session, flush_context):
+        changes = session.info.setdefault('amenity_index_changes', [])
+        for obj in session.new | session.dirty:
+            attributes = LINK_ATTRIBUTES.get(type(obj))
+            if attributes is None:
+                continue
+            state = inspect(obj)
+            for key in attributes:
+                history = state.attrs[key].history
+                for other in history.added:
+                    changes.append(('link',) + self._pair(obj, other))
+                for other in history.deleted:
+                    changes.append(('unlink',) + self._pair(obj, other))
+        for obj in session.deleted:
+            if isinstance(obj, Place):
+                changes.append(('drop_place', obj.id, None))
+            elif isinstance(obj, Amenity):
+                changes.append(('drop_amenity', None, obj.id))
+
+    @staticmethod
+    def _pair(obj, other):
+        return (obj.id, other.id) if isinstance(obj, Place) else (other.id, obj.id)
+
+    def _discard_changes(self, session):
+        session.info.pop('amenity_index_changes', None)
+
+    def _apply_changes(self, session):
+        changes = session.info.pop('amenity_index_changes', None)
+        if not changes:
+            return
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append(changes)
+            if self._built_at is not None:
+                self._apply(changes)
+
+    def _apply(self, changes):
+        for action, place_id, amenity_id in changes:
+            if action == 'drop_amenity':
+                self._bitmaps.pop(amenity_id, None)
+                continue
+            ordinal = self._ordinals.get(place_id)
+            if action == 'drop_place':
+                if ordinal is not None:
+                    self._clear(ordinal)
+                    del self._ordinals[place_id]
+                    self._place_ids[ordinal] = None
+                continue
+            if ordinal is None:
+                if action == 'unlink':
+                    continue
+                ordinal = self._ordinals[place_id] = len(self._place_ids)
+                self._place_ids.append(place_id)
+            bitmap = self._bitmaps.get(amenity_id, 0)
+            if action == 'link':
+                self._bitmaps[amenity_id] = bitmap | (1 << ordinal)
+            else:
+                self._bitmaps[amenity_id] = bitmap & ~(1 << ordinal)
+
+    def _clear(self, ordinal):
+        mask = ~(1 << ordinal)
+        for amenity_id, bitmap in self._bitmaps.items():
+            self._bitmaps[amenity_id] = bitmap & mask
+
+
+amenity_index = AmenityBitmapIndex()
+
+
+def id_filter(column, ids):
+    """
+    `column IN ids` sent as a single bound parameter on SQLite
+    (json_each), so large match sets stay under the variable limit
+    """
+    ids = sorted(ids)
+    if db.engine.dialect.name == 'sqlite':
+        return column.in_(select(literal_column('value'))
+                          .select_from(func.json_each(json.dumps(ids))))
+    return column.in_(ids)
@@ -1,6 +1,40 @@
-from app.models.amenity import Amenity
+from sqlalchemy.dialects import postgresql, sqlite
+from app.extensions import db
+from app.models.amenity import Amenity, normalize_name
 from app.persistence.repository import SQLAlchemyRepository
 
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING
+CONFLICT_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
 class AmenityRepository(SQLAlchemyRepository):
     def __init__(self):
         super().__init__(Amenity)
+
+    def get_amenity_by_name(self, name):
+        """
+        Look an amenity up by name, ignoring case and spacing,
+        through the unique index on the normalized name.
+        """
+        return self.model.query.filter_by(name_key=normalize_name(name)).first()
+
+    def add_if_name_free(self, name):
+        """
+        Insert an amenity unless its normalized name is taken, in one
+        INSERT ... ON CONFLICT DO NOTHING: the unique index settles
+        concurrent inserts of the same name.
+
+        Returns:
+            str: id of the new amenity, None if the name was taken
+        """
+        insert = CONFLICT_INSERTS.get(db.engine.dialect.name)
+        if insert is None:
+            if self.get_amenity_by_name(name):
+                return None
+            amenity = Amenity(name=name)
+            self.add(amenity)
+            return amenity.id
+        statement = insert(Amenity) \
+            .values(name=name, name_key=normalize_name(name)) \
+            .on_conflict_do_nothing() \
+            .returning(Amenity.id)
+        return db.session.execute(statement).scalar()
@@ -0,0 +1,366 @@
+"""
+Read-through object cache in front of the SQLAlchemy repositories
+
+Only a snapshot of the column values is cached, never a live ORM
+instance: on a hit the snapshot is merged into the current session
+without emitting a SELECT, so relationships still lazy load normally.
+
+The response cache keeps encoded GET responses, tagged with the
+entities they show, so the facade can drop exactly the responses
+a write affects.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from app.extensions import db
+
+
+class LRUCache:
+    """
+    Bounded in-process cache with per-entry TTL and LRU eviction
+
+    Any backend exposing get/set/delete/clear/stats can replace it.
+    """
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
+
+
+class ObjectCache:
+    """
+    Caches model snapshots by (model name, id) with a TTL per model
+
+    Written keys are dropped at once and again when the transaction
+    commits. A snapshot read before a write committed is not stored:
+    readers take a ticket from begin_read() before querying, and put()
+    refuses the snapshot if its key was invalidated after that ticket.
+    """
+    def __init__(self, backend=None, max_invalidations=10000):
+        self.backend = backend or LRUCache()
+        self.enabled = True
+        self.default_ttl = 300
+        self.ttls = {}
+        self.stale_skips = 0
+        self.max_invalidations = max_invalidations
+        self._clock = 0
+        self._invalidated = OrderedDict()  # key -> clock of its last invalidation
+        self._floor = 0  # clock of the newest invalidation forgotten
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('OBJECT_CACHE_ENABLED', True)
+        self.backend.max_size = app.config.get('OBJECT_CACHE_SIZE', 10000)
+        self.default_ttl = app.config.get('OBJECT_CACHE_DEFAULT_TTL', 300)
+        self.ttls = app.config.get('OBJECT_CACHE_TTL', {})
+        for name, listener in (('after_commit', self._invalidate_committed),
+                               ('after_rollback', self._invalidate_committed)):
+            if not event.contains(db.session, name, listener):
+                event.listen(db.session, name, listener)
+
+    def get(self, model, obj_id):
+        if not self.enabled:
+            return None
+        values = self.backend.get((model.__name__, obj_id))
+        if values is None:
+            return None
+        obj = inspect(model).class_manager.new_instance()
+        for key, value in values.items():
+            set_committed_value(obj, key, value)
+        make_transient_to_detached(obj)
+        return db.session.merge(obj, load=False)
+
+    def begin_read(self):
+        """Ticket to pass to put() for a snapshot about to be loaded"""
+        with self._lock:
+            return self._clock
+
+    def put(self, model, obj, ticket):
+        if not self.enabled:
+            return
+        key = (model.__name__, obj.id)
+        # Written in this transaction: the values may never be committed
+        if key in db.session.info.get('object_cache_keys', ()):
+            return
+        values = {attr.key: getattr(obj, attr.key)
+                  for attr in inspect(model).column_attrs}
+        ttl = self.ttls.get(model.__name__, self.default_ttl)
+        with self._lock:
+            if ticket < self._floor or self._invalidated.get(key, -1) >= ticket:
+                self.stale_skips += 1
+                return
+            self.backend.set(key, values, ttl)
+
+    def _drop(self, keys):
+        with self._lock:
+            for key in keys:
+                self._invalidated[key] = self._clock
+                self._invalidated.move_to_end(key)
+                self.backend.delete(key)
+            self._clock += 1
+            while len(self._invalidated) > self.max_invalidations:
+                _, self._floor = self._invalidated.popitem(last=False)
+                self._floor += 1
+
+    def invalidate(self, model, obj_id):
+        """
+        Drop the cached object now and once the current transaction ends
+        """
+        key = (model.__name__, obj_id)
+        self._drop((key,))
+        db.session.info.setdefault('object_cache_keys', set()).add(key)
+
+    def _invalidate_committed(self, session):
+        keys = session.info.pop('object_cache_keys', None)
+        if keys:
+            self._drop(keys)
+
+    def clear(self):
+        with self._lock:
+            self._clock += 1
+            self._floor = self._clock
+            self._invalidated.clear()
+            self.backend.clear()
+
+    def stats(self):
+        return dict(self.backend.stats(), stale_skips=self.stale_skips)
+
+
+object_cache = ObjectCache()
+
+
+class CachedRepository:
+    """
+    Wraps a repository so get() is served from the object cache
+
+    Writes going through the wrapper invalidate the cached entry;
+    everything else is delegated to the wrapped repository.
+    """
+    def __init__(self, repository, cache=object_cache):
+        self.repository = repository
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.repository, name)
+
+    def get(self, obj_id, options=()):
+        """
+        On a hit relationships stay lazy (one query each when used);
+        loader options only shape the query run on a miss.
+        """
+        obj_id = str(obj_id)
+        obj = self.cache.get(self.model, obj_id)
+        if obj is None:
+            ticket = self.cache.begin_read()
+            obj = self.repository.get(obj_id, options)
+            if obj is not None:
+                self.cache.put(self.model, obj, ticket)
+        return obj
+
+    def add(self, obj):
+        self.repository.add(obj)
+        self.cache.invalidate(self.model, obj.id)
+
+    def update(self, obj_id, data):
+        self.cache.invalidate(self.model, str(obj_id))
+        return self.repository.update(obj_id, data)
+
+    def delete(self, obj_id):
+        self.cache.invalidate(self.model, str(obj_id))
+        return self.repository.delete(obj_id)
+
+    def invalidate(self, obj_id):
+        self.cache.invalidate(self.model, str(obj_id))
+
+
+def collection_tag(model):
+    """Tag of the responses listing a model"""
+    return model.__name__
+
+
+def entity_tag(model, obj_id):
+    """Tag of the responses showing one object"""
+    return f'{model.__name__}:{obj_id}'
+
+
+class ResponseCache:
+    """
+    Encoded responses by key, with a TTL and LRU eviction, indexed by tag
+
+    Tags name a collection ('Place') or an entity ('Place:<id>').
+    Invalidated tags are dropped at once and again when the transaction
+    commits. A response is not stored if one of its own tags was
+    invalidated while it was computed, as it may hold data older than
+    the write; writes to unrelated tags do not prevent it.
+    """
+    def __init__(self, max_size=2000, max_invalidations=10000):
+        self.enabled = True
+        self.max_size = max_size
+        self.ttl = 60
+        self.max_invalidations = max_invalidations
+        self._clock = 0
+        self._invalidated = OrderedDict()  # tag -> clock of its last invalidation
+        self._floor = 0  # clock of the newest invalidation forgotten
+        self._entries = OrderedDict()  # key -> (expires, value, tags)
+        self._keys_by_tag = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale_skips = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RESPONSE_CACHE_ENABLED', True)
+        self.max_size = app.config.get('RESPONSE_CACHE_SIZE', 2000)
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', 60)
+        for name, listener in (('after_commit', self._invalidate_committed),
+                               ('after_rollback', self._discard_pending)):
+            if not event.contains(db.session, name, listener):
+                event.listen(db.session, name, listener)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def begin_read(self):
+        """Ticket to pass to set() for a value about to be computed"""
+        with self._lock:
+            return self._clock
+
+    def set(self, key, value, tags, ticket):
+        """
+        Store a value computed since `ticket` (taken before the value
+        was built); skipped if one of its tags was invalidated since.
+        """
+        with self._lock:
+            if ticket < self._floor or any(
+                    self._invalidated.get(tag, -1) >= ticket for tag in tags):
+                self.stale_skips += 1
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value, frozenset(tags))
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def _drop(self, tags):
+        with self._lock:
+            self.invalidations += 1
+            for tag in tags:
+                self._invalidated[tag] = self._clock
+                self._invalidated.move_to_end(tag)
+                for key in list(self._keys_by_tag.get(tag, ())):
+                    self._remove(key)
+            self._clock += 1
+            while len(self._invalidated) > self.max_invalidations:
+                _, self._floor = self._invalidated.popitem(last=False)
+                self._floor += 1
+
+    def invalidate(self, *tags):
+        """
+        Drop the responses carrying any of the tags, now and once
+        the current transaction commits
+        """
+        self._drop(tags)
+        db.session.info.setdefault('response_cache_tags', set()).update(tags)
+
+    def _invalidate_committed(self, session):
+        tags = session.info.pop('response_cache_tags', None)
+        if tags:
+            self._drop(tags)
+
+    def _discard_pending(self, session):
+        session.info.pop('response_cache_tags', None)
+
+    def clear(self):
+        with self._lock:
+            self._clock += 1
+            self._floor = self._clock
+            self._invalidated.clear()
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'tags': len(self._keys_by_tag),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'stale_skips': self.stale_skips,
+                'invalidations': self.invalidations,
+                'evictions': self.evictions,
+            }
+
+
+response_cache = ResponseCache()
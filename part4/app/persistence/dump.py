@@ -0,0 +1,225 @@
+"""
+Catalog export and import
+
+Each table is written to its own file (users.ndjson, places.csv, ...)
+with every column, so a dump restores passwords, timestamps and the
+denormalized columns as they were. Rows are read with yield_per and
+written as they come, and imported in chunks committed one by one:
+memory stays bounded whatever the size of the tables.
+
+Imported rows whose primary key already exists are skipped, so an
+interrupted import can simply be run again. An amenity whose name is
+already taken by another amenity is skipped too, and the links of the
+dump are moved to the existing amenity.
+
+In CSV files NULL is written \\N, as PostgreSQL's COPY does, and the
+backslashes of strings are doubled so a "\\N" string stays a string.
+"""
+
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from itertools import islice
+from sqlalchemy import insert, or_, select
+from app.extensions import db
+from app.models.amenity import normalize_name
+from app.persistence.amenity_repository import CONFLICT_INSERTS
+
+# Tables in foreign key order: referenced tables are imported first
+TABLES = ('users', 'amenities', 'places', 'place_amenity', 'reviews')
+FORMATS = ('ndjson', 'csv')
+CSV_NULL = '\\N'
+
+
+def _path(directory, table, fmt):
+    return os.path.join(directory, f'{table}.{fmt}')
+
+
+def _to_text(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _to_csv(value):
+    if value is None:
+        return CSV_NULL
+    if isinstance(value, str):
+        return value.replace('\\', '\\\\')
+    return _to_text(value)
+
+
+def _from_text(column, value, fmt):
+    """
+    Convert a value read from a dump back to the column's Python type
+    """
+    if value is None or (fmt == 'csv' and value == CSV_NULL):
+        return None
+    if fmt == 'csv':
+        value = value.replace('\\\\', '\\')
+    python_type = column.type.python_type
+    if not isinstance(value, str) or python_type is str:
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is bool:
+        return value.lower() in ('1', 'true')
+    return python_type(value)
+
+
+class _Progress:
+    """
+    Calls report(table, rows, elapsed, done) at most once a second,
+    and once more when the table is done
+    """
+    def __init__(self, table, report):
+        self.table = table
+        self.report = report
+        self.rows = 0
+        self.start = self.last = time.perf_counter()
+
+    def add(self, count):
+        self.rows += count
+        now = time.perf_counter()
+        if self.report and now - self.last >= 1:
+            self.last = now
+            self.report(self.table, self.rows, now - self.start, False)
+
+    def done(self):
+        if self.report:
+            self.report(self.table, self.rows, time.perf_counter() - self.start, True)
+        return self.rows
+
+
+def export_tables(directory, fmt='ndjson', batch_size=1000, report=None):
+    """
+    Write every table to `directory`
+
+    Args:
+        directory (string): destination, created if missing
+        fmt (string): 'ndjson' or 'csv'
+        batch_size (int): rows fetched per round trip
+        report (function): progress callback(table, rows, elapsed, done)
+
+    Returns:
+        dict: number of rows written per table
+    """
+    os.makedirs(directory, exist_ok=True)
+    counts = {}
+    with db.engine.connect() as connection:
+        for name in TABLES:
+            table = db.metadata.tables[name]
+            names = [column.name for column in table.columns]
+            result = connection.execution_options(yield_per=batch_size) \
+                .execute(select(table))
+            progress = _Progress(name, report)
+            with open(_path(directory, name, fmt), 'w', encoding='utf-8',
+                      newline='') as output:
+                if fmt == 'csv':
+                    writer = csv.writer(output)
+                    writer.writerow(names)
+                for rows in result.partitions():
+                    if fmt == 'csv':
+                        writer.writerows(map(_to_csv, row) for row in rows)
+                    else:
+                        output.writelines(
+                            json.dumps(dict(zip(names, map(_to_text, row)))) + '\n'
+                            for row in rows)
+                    progress.add(len(rows))
+            counts[name] = progress.done()
+    return counts
+
+
+def _read_rows(path, fmt):
+    with open(path, encoding='utf-8', newline='') as source:
+        if fmt == 'csv':
+            reader = csv.DictReader(source)
+            for row in reader:
+                # DictReader files extra fields under None and fills
+                # missing ones with None
+                fields = len(reader.fieldnames) + len(row.get(None, ())) - \
+                    sum(value is None for value in row.values())
+                if fields != len(reader.fieldnames):
+                    raise ValueError(f"{path}: line {reader.line_num} has {fields} fields, "
+                                     f"header has {len(reader.fieldnames)}")
+                yield row
+            return
+        for number, line in enumerate(source, 1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    raise ValueError(f"{path}: invalid JSON on line {number}")
+
+
+def _merged_amenities(connection, table, rows):
+    """
+    Map the ids of imported amenities skipped because their name was
+    taken to the id of the amenity holding that name
+    """
+    keys = {normalize_name(row['name']): row['id'] for row in rows if row.get('name')}
+    if not keys:
+        return {}
+    existing = connection.execute(
+        select(table.c.id, table.c.name)
+        .where(or_(table.c.name_key.in_(keys), table.c.name.in_(
+            [row['name'] for row in rows if row.get('name')])))).all()
+    merged = {}
+    for amenity_id, amenity_name in existing:
+        dumped_id = keys.get(normalize_name(amenity_name))
+        if dumped_id is not None and dumped_id != amenity_id:
+            merged[dumped_id] = amenity_id
+    return merged
+
+
+def import_tables(directory, fmt='ndjson', batch_size=1000, report=None):
+    """
+    Load the table files found in `directory`, committing every
+    `batch_size` rows. Missing files are skipped.
+
+    Args:
+        directory (string): folder written by export_tables
+        fmt (string): 'ndjson' or 'csv'
+        batch_size (int): rows inserted and committed together
+        report (function): progress callback(table, rows, elapsed, done)
+
+    Returns:
+        dict: number of rows read per imported table
+
+    Raises:
+        ValueError: if a file holds an unknown column, invalid JSON or a
+            CSV row whose number of fields differs from its header
+    """
+    conflict_insert = CONFLICT_INSERTS.get(db.engine.dialect.name)
+    counts = {}
+    merged = {}  # dumped amenity id -> id of the existing amenity of that name
+    for name in TABLES:
+        path = _path(directory, name, fmt)
+        if not os.path.exists(path):
+            continue
+        table = db.metadata.tables[name]
+        statement = conflict_insert(table).on_conflict_do_nothing() \
+            if conflict_insert else insert(table)
+        rows = _read_rows(path, fmt)
+        progress = _Progress(name, report)
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            values = []
+            for row in batch:
+                unknown = set(row) - set(table.columns.keys())
+                if unknown:
+                    raise ValueError(f"{path}: unknown columns {', '.join(sorted(unknown))}")
+                values.append({key: _from_text(table.columns[key], value, fmt)
+                               for key, value in row.items()})
+            if name == 'place_amenity' and merged:
+                for link in values:
+                    link['amenity_id'] = merged.get(link['amenity_id'], link['amenity_id'])
+            with db.engine.begin() as connection:
+                connection.execute(statement, values)
+                if name == 'amenities':
+                    merged.update(_merged_amenities(connection, table, values))
+            progress.add(len(batch))
+        counts[name] = progress.done()
+    return counts
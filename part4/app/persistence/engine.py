@@ -0,0 +1,40 @@
+"""
+Engine setup: SQLite pragmas applied on every new connection
+and connection pool statistics
+"""
+
+from sqlalchemy import event
+from app.extensions import db
+
+
+def configure_engine(app):
+    """
+    Install the SQLITE_PRAGMAS of the app config on the engine
+
+    Must run before the first connection is opened so every
+    pooled connection gets the same settings.
+    """
+    pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def pool_stats():
+    """
+    Return the state of the connection pool of the current engine
+    """
+    pool = db.engine.pool
+    stats = {'pool': type(pool).__name__, 'status': pool.status()}
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        if hasattr(pool, name):
+            stats[name] = getattr(pool, name)()
+    return stats
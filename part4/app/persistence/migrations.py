@@ -0,0 +1,252 @@
+"""
+Versioned schema migrations
+
+Each migration is applied once, in order, inside its own transaction and
+recorded in the schema_version table. Migrations are frozen: never edit
+one that has shipped, append a new one instead. schema_drift() compares
+the migrated database with the models so the two cannot silently diverge.
+"""
+
+from datetime import datetime
+from sqlalchemy import inspect
+from app.extensions import db
+from app.persistence.search_index import fts_rowid
+
+
+def _create_places_fts(connection):
+    # FTS5 is SQLite specific: other databases run without text search
+    if connection.dialect.name != 'sqlite':
+        return
+    connection.exec_driver_sql(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS places_fts USING fts5("
+        "title, description, place_id UNINDEXED, "
+        "tokenize = 'unicode61 remove_diacritics 2')")
+    rows = connection.exec_driver_sql("SELECT id, title, description FROM places")
+    entries = [(fts_rowid(place_id), place_id, title, description or '')
+               for place_id, title, description in rows]
+    if entries:
+        connection.exec_driver_sql(
+            "INSERT INTO places_fts (rowid, place_id, title, description) "
+            "VALUES (?, ?, ?, ?)", entries)
+
+
+def _add_amenity_name_key(connection):
+    connection.exec_driver_sql("ALTER TABLE amenities ADD COLUMN name_key VARCHAR(100)")
+    rows = connection.exec_driver_sql(
+        "SELECT id, name FROM amenities ORDER BY created_at, id")
+    kept, keys, merged = {}, [], []
+    for amenity_id, name in rows:
+        key = ' '.join(name.split()).casefold()
+        if key in kept:
+            merged.append((amenity_id, kept[key]))
+        else:
+            kept[key] = amenity_id
+            keys.append((key, amenity_id))
+    # Later case variants of a name are merged into the first one: their
+    # places link to it instead, then the variants are deleted
+    for amenity_id, kept_id in merged:
+        connection.exec_driver_sql(
+            "UPDATE place_amenity SET amenity_id = ? WHERE amenity_id = ? AND place_id NOT IN "
+            "(SELECT place_id FROM place_amenity WHERE amenity_id = ?)",
+            (kept_id, amenity_id, kept_id))
+        connection.exec_driver_sql(
+            "DELETE FROM place_amenity WHERE amenity_id = ?", (amenity_id,))
+        connection.exec_driver_sql("DELETE FROM amenities WHERE id = ?", (amenity_id,))
+    if keys:
+        connection.exec_driver_sql(
+            "UPDATE amenities SET name_key = ? WHERE id = ?", keys)
+    connection.exec_driver_sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_amenities_name_key ON amenities (name_key)")
+
+
+# (version, description, list of SQL statements or callable(connection))
+MIGRATIONS = [
+    (1, "Initial schema", [
+        """CREATE TABLE IF NOT EXISTS users (
+            first_name VARCHAR(50) NOT NULL,
+            last_name VARCHAR(50) NOT NULL,
+            email VARCHAR(120) NOT NULL,
+            password VARCHAR(128) NOT NULL,
+            is_admin BOOLEAN,
+            id VARCHAR(36) NOT NULL,
+            created_at DATETIME,
+            updated_at DATETIME,
+            PRIMARY KEY (id),
+            UNIQUE (email)
+        )""",
+        """CREATE TABLE IF NOT EXISTS amenities (
+            name VARCHAR(100) NOT NULL,
+            id VARCHAR(36) NOT NULL,
+            created_at DATETIME,
+            updated_at DATETIME,
+            PRIMARY KEY (id),
+            UNIQUE (name)
+        )""",
+        """CREATE TABLE IF NOT EXISTS places (
+            title VARCHAR(100) NOT NULL,
+            description TEXT,
+            price FLOAT NOT NULL,
+            latitude FLOAT NOT NULL,
+            longitude FLOAT NOT NULL,
+            owner_id VARCHAR(36) NOT NULL,
+            id VARCHAR(36) NOT NULL,
+            created_at DATETIME,
+            updated_at DATETIME,
+            PRIMARY KEY (id),
+            FOREIGN KEY(owner_id) REFERENCES users (id)
+        )""",
+        """CREATE TABLE IF NOT EXISTS place_amenity (
+            place_id VARCHAR(36) NOT NULL,
+            amenity_id VARCHAR(36) NOT NULL,
+            PRIMARY KEY (place_id, amenity_id),
+            FOREIGN KEY(place_id) REFERENCES places (id),
+            FOREIGN KEY(amenity_id) REFERENCES amenities (id)
+        )""",
+        """CREATE TABLE IF NOT EXISTS reviews (
+            text TEXT NOT NULL,
+            rating INTEGER NOT NULL,
+            user_id VARCHAR(36) NOT NULL,
+            place_id VARCHAR(36) NOT NULL,
+            id VARCHAR(36) NOT NULL,
+            created_at DATETIME,
+            updated_at DATETIME,
+            PRIMARY KEY (id),
+            FOREIGN KEY(user_id) REFERENCES users (id),
+            FOREIGN KEY(place_id) REFERENCES places (id)
+        )""",
+    ]),
+    (2, "Index foreign keys, place price and the pagination key", [
+        "CREATE INDEX IF NOT EXISTS ix_users_created_at_id ON users (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_amenities_created_at_id ON amenities (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_places_created_at_id ON places (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_places_owner_id ON places (owner_id)",
+        "CREATE INDEX IF NOT EXISTS ix_places_price ON places (price)",
+        "CREATE INDEX IF NOT EXISTS ix_place_amenity_amenity_id ON place_amenity (amenity_id)",
+        "CREATE INDEX IF NOT EXISTS ix_reviews_created_at_id ON reviews (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_reviews_place_id ON reviews (place_id)",
+        "CREATE INDEX IF NOT EXISTS ix_reviews_user_id ON reviews (user_id)",
+    ]),
+    (3, "Denormalized rating aggregates on places", [
+        "ALTER TABLE places ADD COLUMN review_count INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE places ADD COLUMN rating_sum INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE places ADD COLUMN rating_1_count INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE places ADD COLUMN rating_2_count INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE places ADD COLUMN rating_3_count INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE places ADD COLUMN rating_4_count INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE places ADD COLUMN rating_5_count INTEGER NOT NULL DEFAULT 0",
+        """UPDATE places SET
+            review_count = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id),
+            rating_sum = (SELECT COALESCE(SUM(rating), 0) FROM reviews WHERE reviews.place_id = places.id),
+            rating_1_count = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id AND rating = 1),
+            rating_2_count = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id AND rating = 2),
+            rating_3_count = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id AND rating = 3),
+            rating_4_count = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id AND rating = 4),
+            rating_5_count = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id AND rating = 5)
+        """,
+    ]),
+    (4, "Spatial grid cell on places (0.1 degree cells)", [
+        "ALTER TABLE places ADD COLUMN geo_cell INTEGER",
+        """UPDATE places SET geo_cell =
+            MIN(CAST((latitude + 90) / 0.1 AS INTEGER), 1799) * 3600 +
+            MIN(CAST((longitude + 180) / 0.1 AS INTEGER), 3599)
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_places_geo_cell ON places (geo_cell)",
+    ]),
+    (5, "Index places on (price, id) for price filters and ordering", [
+        "CREATE INDEX IF NOT EXISTS ix_places_price_id ON places (price, id)",
+        "DROP INDEX IF EXISTS ix_places_price",
+    ]),
+    (6, "Full-text index over place titles and descriptions", _create_places_fts),
+    (7, "Case-insensitive unique amenity names", _add_amenity_name_key),
+    (8, "Index updated_at, the version of conditional GETs", [
+        "CREATE INDEX IF NOT EXISTS ix_users_updated_at ON users (updated_at)",
+        "CREATE INDEX IF NOT EXISTS ix_amenities_updated_at ON amenities (updated_at)",
+        "CREATE INDEX IF NOT EXISTS ix_places_updated_at ON places (updated_at)",
+        "CREATE INDEX IF NOT EXISTS ix_reviews_updated_at ON reviews (updated_at)",
+    ]),
+]
+
+
+def _ensure_version_table(connection):
+    connection.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INTEGER PRIMARY KEY, "
+        "description VARCHAR(255) NOT NULL, "
+        "applied_at DATETIME NOT NULL)")
+
+
+def _applied_versions(connection):
+    _ensure_version_table(connection)
+    rows = connection.exec_driver_sql(
+        "SELECT version, applied_at FROM schema_version")
+    return {row[0]: row[1] for row in rows}
+
+
+def current_version():
+    """
+    Return the latest applied migration version (0 for an empty database)
+    """
+    with db.engine.begin() as connection:
+        return max(_applied_versions(connection), default=0)
+
+
+def upgrade(target=None):
+    """
+    Apply every pending migration up to target (default: the latest)
+
+    Returns:
+        list: versions applied by this call
+    """
+    with db.engine.begin() as connection:
+        applied = _applied_versions(connection)
+
+    done = []
+    for version, description, steps in MIGRATIONS:
+        if version in applied or (target is not None and version > target):
+            continue
+        with db.engine.begin() as connection:
+            if callable(steps):
+                steps(connection)
+            else:
+                for statement in steps:
+                    connection.exec_driver_sql(statement)
+            connection.exec_driver_sql(
+                "INSERT INTO schema_version (version, description, applied_at) "
+                "VALUES (?, ?, ?)", (version, description, datetime.utcnow()))
+        done.append(version)
+    return done
+
+
+def status():
+    """
+    Return (version, description, applied_at or None) for every migration
+    """
+    with db.engine.begin() as connection:
+        applied = _applied_versions(connection)
+    return [(version, description, applied.get(version))
+            for version, description, _ in MIGRATIONS]
+
+
+def schema_drift():
+    """
+    Compare the database with the models
+
+    Returns:
+        list: human readable differences (empty when in sync)
+    """
+    inspector = inspect(db.engine)
+    tables = set(inspector.get_table_names())
+    problems = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in tables:
+            problems.append(f"missing table {table.name}")
+            continue
+        columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in columns:
+                problems.append(f"missing column {table.name}.{column.name}")
+        indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                problems.append(f"missing index {index.name} on {table.name}")
+    return problems
@@ -1,6 +1,160 @@
-from app.models.place import Place
+from collections import Counter
+from sqlalchemy import func, or_, select, update
+from app.extensions import db
+from app.models import geo
+from app.models.place import Place, RATINGS, place_amenity
+from app.models.review import Review
+from app.models.user import User
 from app.persistence.repository import SQLAlchemyRepository
 
+# Nearest-place search: first radius tried, most candidates read per
+# step, and the smallest step before accepting a capped answer
+NEAR_START_KM = 2.0
+NEAR_MAX_CANDIDATES = 5000
+NEAR_MIN_STEP_KM = 0.01
+
 class PlaceRepository(SQLAlchemyRepository):
     def __init__(self):
         super().__init__(Place)
+
+    def get_version(self, place_id):
+        """
+        The detail view embeds the owner: the version of a place is
+        its own updated_at and the owner's.
+        """
+        return db.session.execute(
+            select(Place.updated_at, User.updated_at)
+            .join(User, User.id == Place.owner_id)
+            .where(Place.id == str(place_id))
+        ).first()
+
+    def count_amenity_links(self, amenity_ids):
+        """
+        Number of place <-> amenity links of the given amenities
+        """
+        return db.session.execute(
+            select(func.count()).select_from(place_amenity)
+            .where(place_amenity.c.amenity_id.in_([str(i) for i in amenity_ids]))
+        ).scalar()
+
+    @staticmethod
+    def having_all_amenities(amenity_ids):
+        """
+        Filter keeping the places linked to every given amenity, as a
+        semi-join on place_amenity, so LIMIT and the cursor stay in SQL
+        """
+        amenity_ids = sorted({str(amenity_id) for amenity_id in amenity_ids})
+        return Place.id.in_(
+            select(place_amenity.c.place_id)
+            .where(place_amenity.c.amenity_id.in_(amenity_ids))
+            .group_by(place_amenity.c.place_id)
+            .having(func.count() == len(amenity_ids)))
+
+    def apply_rating_change(self, place_id, added=(), removed=()):
+        """
+        Adjust the rating aggregates of a place in one atomic UPDATE.
+
+        Args:
+            place_id (UUID): place whose reviews changed
+            added (iterable): ratings of new reviews
+            removed (iterable): ratings of deleted reviews
+        """
+        delta = Counter(added)
+        delta.subtract(removed)
+        values = {
+            'review_count': Place.review_count + sum(delta.values()),
+            'rating_sum': Place.rating_sum + sum(r * n for r, n in delta.items()),
+        }
+        for rating, count in delta.items():
+            if count:
+                column = getattr(Place, f'rating_{rating}_count')
+                values[column.key] = column + count
+        db.session.execute(
+            update(Place).where(Place.id == str(place_id)).values(**values)
+            .execution_options(synchronize_session='fetch'))
+
+    def rebuild_rating_aggregates(self):
+        """
+        Recompute every place's aggregates from the reviews table
+        with one UPDATE using correlated subqueries.
+
+        Returns:
+            int: number of places updated
+        """
+        def reviews_of_place(column, *conditions):
+            return select(column) \
+                .where(Review.place_id == Place.id, *conditions) \
+                .correlate(Place).scalar_subquery()
+
+        values = {
+            'review_count': reviews_of_place(func.count(Review.id)),
+            'rating_sum': reviews_of_place(func.coalesce(func.sum(Review.rating), 0)),
+        }
+        for rating in RATINGS:
+            values[f'rating_{rating}_count'] = reviews_of_place(
+                func.count(Review.id), Review.rating == rating)
+        result = db.session.execute(
+            update(Place).values(**values)
+            .execution_options(synchronize_session=False))
+        db.session.expire_all()
+        return result.rowcount
+
+    def get_in_bbox(self, min_lat, min_lng, max_lat, max_lng, columns, limit=None):
+        """
+        Places inside a bounding box.
+
+        The indexed geo_cell ranges select the candidates; the exact
+        coordinates are then checked in SQL on those candidates only.
+        A box with min_lng > max_lng crosses the antimeridian.
+        """
+        cells = or_(*(Place.geo_cell.between(lo, hi) for lo, hi in
+                      geo.cell_ranges(min_lat, min_lng, max_lat, max_lng)))
+        longitudes = or_(*(Place.longitude.between(west, east) for west, east in
+                           geo.longitude_spans(min_lng, max_lng)))
+        query = self._projection(columns).filter(
+            cells, Place.latitude.between(min_lat, max_lat), longitudes)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def get_near(self, latitude, longitude, radius_km, columns, limit):
+        """
+        Places within radius_km of a point, nearest first.
+
+        The search starts NEAR_START_KM around the point and doubles
+        until it holds `limit` places or reaches radius_km, so a dense
+        area only reads the few cells around the point. A box holding
+        more than NEAR_MAX_CANDIDATES places is bisected down instead;
+        below NEAR_MIN_STEP_KM the capped candidates are used as is.
+
+        Returns:
+            list: (row, distance in km) tuples
+        """
+        columns = list(dict.fromkeys([*columns, 'latitude', 'longitude']))
+        cap = max(NEAR_MAX_CANDIDATES, limit * 4)
+        low, high = 0.0, None
+        searched = min(radius_km, NEAR_START_KM)
+        while True:
+            candidates = self.get_in_bbox(
+                *geo.bbox_around(latitude, longitude, searched), columns, limit=cap + 1)
+            truncated = len(candidates) > cap
+            if truncated and searched - low > NEAR_MIN_STEP_KM:
+                high = searched
+                searched = (low + high) / 2
+                continue
+            hits = []
+            for row in candidates[:cap]:
+                distance = geo.haversine_km(latitude, longitude, row.latitude, row.longitude)
+                if distance <= searched:
+                    hits.append((row, distance))
+            if truncated or len(hits) >= limit or searched >= radius_km:
+                break
+            low = searched
+            if high is None:
+                searched = min(searched * 2, radius_km)
+            elif high - low > NEAR_MIN_STEP_KM:
+                searched = (low + high) / 2
+            else:
+                searched = high
+        hits.sort(key=lambda hit: hit[1])
+        return hits[:limit]
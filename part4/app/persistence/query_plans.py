@@ -0,0 +1,81 @@
+"""
+Query plan report for the queries issued by the facade
+
+Each entry rebuilds the statement a facade method sends to the database
+(with placeholder values) so `flask hbnb explain` can show which index,
+if any, SQLite picks for it.
+"""
+
+from datetime import datetime
+from sqlalchemy import or_, select, tuple_
+from app.extensions import db
+from app.models.user import User
+from app.models.amenity import Amenity
+from app.models.place import Place, place_amenity
+from app.models.review import Review
+from app.models import geo
+
+PLACEHOLDER_ID = '00000000-0000-0000-0000-000000000000'
+
+
+def _page(model):
+    return select(model).where(
+        tuple_(model.created_at, model.id) >
+        tuple_(datetime(2000, 1, 1), PLACEHOLDER_ID)
+    ).order_by(model.created_at, model.id).limit(51)
+
+
+FACADE_QUERIES = {
+    'get_user_by_email': lambda: select(User).where(User.email == 'user@example.com'),
+    'get_users_page': lambda: _page(User),
+    'find_amenity_by_name': lambda: select(Amenity).where(Amenity.name_key == 'wifi'),
+    'get_amenities_page': lambda: _page(Amenity),
+    'get_places_page': lambda: _page(Place),
+    'get_places_page_by_price': lambda: select(Place).where(
+        Place.price.between(50, 150),
+        tuple_(Place.price, Place.id) > tuple_(50, PLACEHOLDER_ID)
+    ).order_by(Place.price, Place.id).limit(51),
+    'search_places_in_bbox': lambda: select(Place).where(
+        or_(*(Place.geo_cell.between(lo, hi)
+              for lo, hi in geo.cell_ranges(48.8, 2.25, 48.9, 2.42)))),
+    'places_by_owner': lambda: select(Place).where(Place.owner_id == PLACEHOLDER_ID),
+    'places_by_amenity': lambda: select(place_amenity.c.place_id).where(
+        place_amenity.c.amenity_id == PLACEHOLDER_ID),
+    'get_amenity_places_page': lambda: _page(Place).where(Place.id.in_(
+        select(place_amenity.c.place_id).where(
+            place_amenity.c.amenity_id == PLACEHOLDER_ID))),
+    'get_reviews_by_place': lambda: select(Review).where(Review.place_id == PLACEHOLDER_ID),
+    'reviews_by_user': lambda: select(Review).where(Review.user_id == PLACEHOLDER_ID),
+    'get_reviews_page': lambda: _page(Review),
+}
+
+
+def explain(name):
+    """
+    Return the SQLite query plan of a facade query as a list of strings
+    """
+    statement = FACADE_QUERIES[name]()
+    compiled = statement.compile(dialect=db.engine.dialect)
+    params = tuple(compiled.params[key] for key in compiled.positiontup)
+    with db.engine.connect() as connection:
+        rows = connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {compiled}", params)
+        return [row[-1] for row in rows]
+
+
+def index_report():
+    """
+    Explain every facade query
+
+    Returns:
+        dict: query name -> (uses an index, plan lines)
+    """
+    if db.engine.dialect.name != 'sqlite':
+        raise RuntimeError("Query plans are only reported for SQLite")
+    report = {}
+    for name in FACADE_QUERIES:
+        plan = explain(name)
+        uses_index = any('USING' in line for line in plan) and \
+            not any(line.startswith('SCAN') and 'USING' not in line for line in plan)
+        report[name] = (uses_index, plan)
+    return report
@@ -1,6 +1,42 @@
 from abc import ABC, abstractmethod
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import func, select, tuple_
 from app.extensions import db
 
+
+def encode_cursor(obj, key=('created_at', 'id')):
+    """
+    Build an opaque cursor pointing just after the given object
+    in the order of the `key` attributes.
+    """
+    values = [getattr(obj, name) for name in key]
+    values = [value.isoformat() if isinstance(value, datetime) else value
+              for value in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor, columns):
+    """
+    Decode a cursor built by encode_cursor into values of the
+    given key columns.
+
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("Invalid cursor")
+        return tuple(
+            datetime.fromisoformat(value)
+            if column.type.python_type is datetime
+            else column.type.python_type(value)
+            for column, value in zip(columns, values))
+    except (TypeError, ValueError, UnicodeError) as error:
+        raise ValueError("Invalid cursor") from error
+
 class Repository(ABC):
     @abstractmethod
     def add(self, obj):
@@ -28,11 +64,58 @@ class Repository(ABC):
 
 
 class InMemoryRepository(Repository):
-    def __init__(self):
+    def __init__(self, unique_indexes=(), indexes=()):
+        """
+        Args:
+            unique_indexes (iterable): attributes whose value identifies
+                at most one object (e.g. 'email')
+            indexes (iterable): attributes shared by many objects
+                (e.g. 'place_id')
+        """
         self._storage = {}
+        # attr -> value -> obj
+        self._unique_indexes = {attr: {} for attr in unique_indexes}
+        # attr -> value -> {obj_id: obj}, dicts keep insertion order
+        self._indexes = {attr: {} for attr in indexes}
+        # obj_id -> {attr: value} as indexed, to unindex after mutation
+        self._indexed_values = {}
+
+    def _check_unique(self, obj_id, values):
+        for attr, index in self._unique_indexes.items():
+            if attr not in values or values[attr] is None:
+                continue
+            other = index.get(values[attr])
+            if other is not None and other.id != obj_id:
+                raise ValueError(f"An object with this {attr} already exists.")
+
+    def _index(self, obj):
+        values = {}
+        for attr, index in self._unique_indexes.items():
+            values[attr] = getattr(obj, attr, None)
+            if values[attr] is not None:
+                index[values[attr]] = obj
+        for attr, index in self._indexes.items():
+            values[attr] = getattr(obj, attr, None)
+            index.setdefault(values[attr], {})[obj.id] = obj
+        self._indexed_values[obj.id] = values
+
+    def _unindex(self, obj_id):
+        values = self._indexed_values.pop(obj_id, {})
+        for attr, value in values.items():
+            if attr in self._unique_indexes:
+                self._unique_indexes[attr].pop(value, None)
+                continue
+            bucket = self._indexes[attr].get(value, {})
+            bucket.pop(obj_id, None)
+            if not bucket:
+                self._indexes[attr].pop(value, None)
 
     def add(self, obj):
+        self._check_unique(obj.id, {attr: getattr(obj, attr, None)
+                                    for attr in self._unique_indexes})
+        self._unindex(obj.id)
         self._storage[obj.id] = obj
+        self._index(obj)
 
     def get(self, obj_id):
         return self._storage.get(obj_id)
@@ -43,49 +126,170 @@ class InMemoryRepository(Repository):
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
-            obj.update(data)
+            self._check_unique(obj.id, data)
+            self._unindex(obj.id)
+            try:
+                obj.update(data)
+            finally:
+                self._index(obj)
 
     def delete(self, obj_id):
         if obj_id in self._storage:
+            self._unindex(obj_id)
             del self._storage[obj_id]
 
     def get_by_attribute(self, attr_name, attr_value):
-        # Iterate through all objects in storage
-        for obj in self._storage.values():
-            # Check if the attribute matches the given value
-            if getattr(obj, attr_name) == attr_value:
-                return obj
-        # Return None if no matching object is found
-        return None
+        # Indexed attributes are a single hash lookup
+        if attr_name in self._unique_indexes:
+            return self._unique_indexes[attr_name].get(attr_value)
+        if attr_name in self._indexes:
+            bucket = self._indexes[attr_name].get(attr_value)
+            return next(iter(bucket.values())) if bucket else None
+        # Otherwise fall back to a full scan
+        return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        if attr_name in self._unique_indexes:
+            obj = self._unique_indexes[attr_name].get(attr_value)
+            return [obj] if obj is not None else []
+        if attr_name in self._indexes:
+            return list(self._indexes[attr_name].get(attr_value, {}).values())
+        return [obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value]
 
 
 class SQLAlchemyRepository(Repository):
     def __init__(self, model):
         self.model = model
 
+    # Writes only flush: the unit of work commits once per request
+
     def add(self, obj):
         db.session.add(obj)
-        db.session.commit()
+        db.session.flush()
 
-    def get(self, obj_id):
+    def add_many(self, objs, chunk_size=1000):
+        """
+        Insert objects in chunks inside the current transaction.
+
+        Each chunk is flushed as one executemany INSERT and then detached
+        from the session so memory stays bounded.
+        """
+        for start in range(0, len(objs), chunk_size):
+            chunk = objs[start:start + chunk_size]
+            db.session.add_all(chunk)
+            db.session.flush()
+            for obj in chunk:
+                db.session.expunge(obj)
+
+    def get(self, obj_id, options=()):
+        """
+        Fetch an object by id; `options` are loader options
+        (joinedload, selectinload...) applied to the query.
+        """
+        if options:
+            return self.model.query.options(*options) \
+                             .filter(self.model.id == str(obj_id)).first()
         return self.model.query.get(str(obj_id))  # Ensure obj_id is a string
 
+    def get_existing_ids(self, obj_ids):
+        """
+        Return the subset of obj_ids that exist, in a single query.
+        """
+        obj_ids = {str(obj_id) for obj_id in obj_ids}
+        if not obj_ids:
+            return set()
+        rows = db.session.query(self.model.id).filter(self.model.id.in_(obj_ids))
+        return {row.id for row in rows}
+
     def get_all(self):
         return self.model.query.all()
 
+    def get_version(self, obj_id):
+        """
+        Version of an object without loading it: a tuple of
+        timestamps that changes whenever its representation may
+        change (None if the object does not exist).
+        """
+        return db.session.execute(
+            select(self.model.updated_at).where(self.model.id == str(obj_id))
+        ).first()
+
+    def get_table_version(self, filters=()):
+        """
+        Version of a set of rows: (count, max(updated_at)).
+        An insert or update moves the latest timestamp, a delete
+        lowers the count.
+        """
+        return tuple(db.session.execute(
+            select(func.count(), func.max(self.model.updated_at))
+            .select_from(self.model).where(*filters)
+        ).one())
+
+    def _projection(self, columns, key=('created_at', 'id')):
+        """
+        Query selecting only the named columns (plus the pagination key),
+        returning lightweight rows instead of hydrated entities.
+        """
+        names = list(dict.fromkeys(['id', *key, *columns]))
+        return db.session.query(*(getattr(self.model, name) for name in names))
+
+    def get_page(self, limit, cursor=None, columns=None, filters=(),
+                 sort='created_at'):
+        """
+        Return at most `limit` objects ordered by (sort, id),
+        starting after `cursor`, and the cursor of the next page
+        (None when this is the last page).
+
+        With `columns`, rows holding only those attributes are returned.
+        `filters` are SQL expressions restricting the rows.
+        `sort` names the ordering attribute, prefixed with '-' for
+        descending order; id breaks ties so the order is total.
+        """
+        descending = sort.startswith('-')
+        key = (sort.lstrip('-'), 'id')
+        key_columns = [getattr(self.model, name) for name in key]
+        query = self._projection(columns, key) if columns else self.model.query
+        query = query.filter(*filters)
+        if cursor:
+            position = tuple_(*decode_cursor(cursor, key_columns))
+            query = query.filter(tuple_(*key_columns) < position if descending
+                                 else tuple_(*key_columns) > position)
+        if descending:
+            key_columns = [column.desc() for column in key_columns]
+        items = query.order_by(*key_columns).limit(limit + 1).all()
+        if len(items) > limit:
+            items = items[:limit]
+            return items, encode_cursor(items[-1], key)
+        return items, None
+
+    def iter_rows(self, columns, filters=(), sort='created_at', batch_size=1000):
+        """
+        Yield every row matching `filters` in (sort, id) order, holding
+        only the named columns (plus id). Rows are fetched `batch_size`
+        at a time, so memory stays constant whatever the table size.
+        """
+        descending = sort.startswith('-')
+        key_columns = [getattr(self.model, name) for name in (sort.lstrip('-'), 'id')]
+        names = list(dict.fromkeys(['id', *columns]))
+        query = select(*(getattr(self.model, name) for name in names)) \
+            .where(*filters) \
+            .order_by(*(column.desc() if descending else column for column in key_columns)) \
+            .execution_options(yield_per=batch_size)
+        yield from db.session.execute(query)
+
     def update(self, obj_id, data):
         obj = self.get(obj_id)  # Ensure obj_id is used correctly
         if obj:
             for key, value in data.items():
                 setattr(obj, key, value)
-            db.session.commit()
+            db.session.flush()
         return obj  # Return the updated object
 
     def delete(self, obj_id):
         obj = self.get(obj_id)
         if obj:
             db.session.delete(obj)
-            db.session.commit()
+            db.session.flush()
 
     def get_by_attribute(self, attr_name, attr_value):
         return self.model.query.filter_by(**{attr_name: attr_value}).all()  # Handle relationships
@@ -0,0 +1,121 @@
+"""
+SQLite FTS5 index over place titles and descriptions
+
+places_fts is a shadow table written by the facade next to every place
+insert or update. Its rowid is derived from the place UUID, so replacing
+the entry of one place is a rowid lookup, not a scan. Hits are ranked
+with BM25, a title match weighing more than a description match.
+"""
+
+import re
+import uuid
+from sqlalchemy import Float, column, func, literal_column, select, table, tuple_
+from app.extensions import db
+from app.models.place import Place
+from app.persistence.repository import decode_cursor, encode_cursor
+
+places_fts = table('places_fts', column('rowid'), column('place_id'),
+                   column('title'), column('description'))
+
+# BM25 weights of the title and description columns
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+
+def fts_rowid(place_id):
+    """
+    Stable 63-bit rowid of a place entry, taken from its UUID
+    """
+    return uuid.UUID(str(place_id)).int >> 65
+
+
+def match_expression(text):
+    """
+    Turn free text into an FTS5 query: every word must match,
+    the last one as a prefix. FTS5 operators typed by the user are
+    quoted away.
+
+    Raises:
+        ValueError: if the text holds no word
+    """
+    words = re.findall(r'\w+', text or '')
+    if not words:
+        raise ValueError("q must contain at least one word")
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def index_rows(places):
+    return [{'rowid': fts_rowid(place.id), 'place_id': place.id,
+             'title': place.title, 'description': place.description or ''}
+            for place in places]
+
+
+class PlaceSearchIndex:
+    """
+    Maintains and queries places_fts (SQLite only, a no-op elsewhere)
+    """
+
+    @staticmethod
+    def available():
+        return db.engine.dialect.name == 'sqlite'
+
+    def index(self, places):
+        """
+        Insert or replace the entries of the given places
+        """
+        if not places or not self.available():
+            return
+        rows = index_rows(places)
+        db.session.execute(places_fts.delete().where(
+            places_fts.c.rowid.in_([row['rowid'] for row in rows])))
+        db.session.execute(places_fts.insert(), rows)
+
+    def rebuild(self):
+        """
+        Recreate every entry from the places table
+
+        Returns:
+            int: number of places indexed
+        """
+        if not self.available():
+            raise RuntimeError("Full-text search is only available on SQLite")
+        db.session.execute(places_fts.delete())
+        count = 0
+        result = db.session.execute(
+            select(Place.id, Place.title, Place.description)
+            .execution_options(yield_per=1000))
+        for partition in result.partitions():
+            db.session.execute(places_fts.insert(), index_rows(partition))
+            count += len(partition)
+        return count
+
+    def search(self, text, limit, cursor=None, columns=()):
+        """
+        Return at most `limit` rows (the place columns plus the BM25
+        `score`, lower is better) in relevance order starting after `cursor`,
+        and the cursor of the next page.
+
+        Raises:
+            ValueError: if the text or the cursor is invalid, or the
+                database has no full-text index
+        """
+        if not self.available():
+            raise ValueError("Full-text search is not available on this database")
+        score = func.bm25(literal_column('places_fts'),
+                          TITLE_WEIGHT, DESCRIPTION_WEIGHT, type_=Float).label('score')
+        query = select(Place.id, *(getattr(Place, name) for name in columns), score) \
+            .select_from(places_fts) \
+            .join(Place, Place.id == places_fts.c.place_id) \
+            .where(literal_column('places_fts').op('MATCH')(match_expression(text)))
+        key = (column('score', Float), Place.id)
+        if cursor:
+            query = query.where(tuple_(score, Place.id) >
+                                tuple_(*decode_cursor(cursor, key)))
+        rows = db.session.execute(
+            query.order_by(score, Place.id).limit(limit + 1)).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, encode_cursor(rows[-1], ('score', 'id'))
+        return rows, None
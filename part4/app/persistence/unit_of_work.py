@@ -0,0 +1,77 @@
+"""
+Request-scoped unit of work
+
+Repositories only flush their changes; everything done while handling
+a request is committed once after the view returns, or rolled back if
+the view failed. Outside of a request (CLI, run.py), each facade write
+runs in its own transaction.
+"""
+
+from contextlib import contextmanager
+from functools import wraps
+from flask import g
+from app.extensions import db
+
+
+class UnitOfWork:
+    def init_app(self, app):
+        app.before_request(self._begin)
+        app.after_request(self._finish)
+        app.teardown_request(self._teardown)
+
+    @property
+    def active(self):
+        return g.get('unit_of_work_active', False)
+
+    def _begin(self):
+        g.unit_of_work_active = True
+
+    def _finish(self, response):
+        """
+        Commit once if the request succeeded, roll back otherwise
+        """
+        g.unit_of_work_active = False
+        if response.status_code < 400:
+            db.session.commit()
+        else:
+            db.session.rollback()
+        return response
+
+    def _teardown(self, exc):
+        # after_request did not run (the view raised): drop the changes
+        if g.get('unit_of_work_active', False):
+            g.unit_of_work_active = False
+            db.session.rollback()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Join the current unit of work, or open one that commits
+        when the block exits successfully
+        """
+        if self.active:
+            yield
+            return
+        g.unit_of_work_active = True
+        try:
+            yield
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            g.unit_of_work_active = False
+
+
+unit_of_work = UnitOfWork()
+
+
+def transactional(func):
+    """
+    Decorator running a facade write inside the unit of work
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with unit_of_work.transaction():
+            return func(*args, **kwargs)
+    return wrapper
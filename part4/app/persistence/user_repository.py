@@ -1,19 +1,34 @@
-from app.models.user import User
+from sqlalchemy import func, update
 from app.extensions import db
+from app.models.user import User
+from app.persistence.repository import SQLAlchemyRepository
 
-class UserRepository:
+class UserRepository(SQLAlchemyRepository):
     def __init__(self):
-        self.model = User
-
-    def add(self, user):
-        db.session.add(user)
-        db.session.commit()
-
-    def get(self, user_id):
-        return self.model.query.get(user_id)
+        super().__init__(User)
 
     def get_user_by_email(self, email):
         return self.model.query.filter_by(email=email).first()
 
-    def get_all(self):
-        return self.model.query.all()
+    def replace_password_hash(self, user_id, old_hash, new_hash):
+        """
+        Swap the password hash only if it is still old_hash, so a
+        password changed in the meantime is never overwritten.
+
+        Returns:
+            bool: True if the hash was replaced
+        """
+        result = db.session.execute(
+            update(User)
+            .where(User.id == str(user_id), User.password == old_hash)
+            .values(password=new_hash)
+            .execution_options(synchronize_session=False))
+        return result.rowcount == 1
+
+    def count_by_password_prefix(self, length):
+        """
+        Count users per leading `length` characters of their password
+        hash (where bcrypt stores its cost), in one grouped scan.
+        """
+        prefix = func.substr(User.password, 1, length)
+        return dict(db.session.query(prefix, func.count()).group_by(prefix).all())
@@ -1,11 +1,47 @@
+from collections import Counter
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import configure_mappers, joinedload, selectinload
 from app.persistence.repository import InMemoryRepository, SQLAlchemyRepository
 from app.persistence.user_repository import UserRepository
+from app.persistence.place_repository import PlaceRepository
+from app.persistence.amenity_repository import AmenityRepository
+from app.persistence.unit_of_work import transactional
+from app.persistence.cache import CachedRepository, response_cache, collection_tag, entity_tag
+from app.persistence.search_index import PlaceSearchIndex
+from app.passwords import password_hasher
+from app.persistence.amenity_index import amenity_index, id_filter
 from app.models.user import User
 from app.models.amenity import Amenity
-from app.models.place import Place
+from app.models.place import Place, place_amenity
 from app.models.review import Review
 
 
+# Loading plans: the relationships an endpoint needs, fetched with a fixed
+# number of statements however many related rows exist
+PLACE_LOAD_PLANS = {
+    # place + owner in one JOINed SELECT
+    'detail': lambda: (joinedload(Place.user),),
+    # place, then all its reviews in one SELECT ... IN
+    'reviews': lambda: (selectinload(Place.reviews),),
+    # owner joined, amenities and reviews in one SELECT ... IN each
+    'full': lambda: (joinedload(Place.user), selectinload(Place.amenities),
+                     selectinload(Place.reviews)),
+}
+
+
+# Orderings accepted by get_places_page, each walking an index on (column, id)
+PLACE_SORTS = ('created_at', 'price', '-price')
+
+
+def _load_options(plans, plan):
+    if plan is None:
+        return ()
+    configure_mappers()  # backrefs such as Place.user exist once configured
+    return plans[plan]()
+
+
 class HBnBFacade:
     """
     Facade class to interact between the application
@@ -17,18 +53,20 @@ class HBnBFacade:
 
         Initialize repositories for user, place, review, and amenity
         """
-        self.user_repo = UserRepository()
-        self.place_repo = SQLAlchemyRepository(Place)
-        self.review_repo = SQLAlchemyRepository(Review)
-        self.amenity_repo = SQLAlchemyRepository(Amenity)
+        self.user_repo = CachedRepository(UserRepository())
+        self.place_repo = CachedRepository(PlaceRepository())
+        self.review_repo = CachedRepository(SQLAlchemyRepository(Review))
+        self.amenity_repo = CachedRepository(AmenityRepository())
+        self.place_search = PlaceSearchIndex()
 
 # USER ENDPOINTS
+    @transactional
     def create_user(self, user_data):
         """
         create_user
 
         Create a new user and add it to the user repository
-        Hash the password before adding to repo
+        The password is hashed once, by the User constructor
 
         Args:
             user_data (dict): A dictionary containing user data
@@ -38,8 +76,8 @@ class HBnBFacade:
         """
 
         user = User(**user_data)
-        user.hash_password(user_data['password'])
         self.user_repo.add(user)
+        response_cache.invalidate(collection_tag(User))
         return user
 
     def get_all_users(self):
@@ -53,6 +91,38 @@ class HBnBFacade:
         """
         return self.user_repo.get_all()
 
+    def get_users_page(self, limit, cursor=None, columns=None):
+        """
+        get_users_page
+
+        Retrieve one page of users in creation order
+
+        Args:
+            limit (int): maximum number of users to return
+            cursor (string): opaque cursor returned by the previous page
+            columns (list): attribute names to load instead of full objects
+
+        Returns:
+            tuple: list of User objects (rows when columns is set)
+                and the cursor of the next page
+        """
+        return self.user_repo.get_page(limit, cursor, columns)
+
+    def stream_users(self, columns, batch_size=1000):
+        """
+        stream_users
+
+        Iterate over every user in creation order, fetched in batches
+
+        Args:
+            columns (list): attribute names of the rows
+            batch_size (int): rows fetched per round trip
+
+        Returns:
+            iterator: rows holding the columns
+        """
+        return self.user_repo.iter_rows(columns, batch_size=batch_size)
+
     def get_user(self, user_id):
         """
         get_user
@@ -67,6 +137,46 @@ class HBnBFacade:
         """
         return self.user_repo.get(user_id)
 
+    def get_user_version(self, user_id):
+        """
+        get_user_version
+
+        Version of a user for conditional GETs, read without loading it
+
+        Args:
+            user_id (UUID): UUID of the user
+
+        Returns:
+            tuple: timestamps identifying the current representation,
+                None if the user does not exist
+        """
+        return self.user_repo.get_version(user_id)
+
+    def get_users_version(self):
+        """
+        get_users_version
+
+        Version of the user list for conditional GETs
+
+        Returns:
+            tuple: number of users and latest updated_at
+        """
+        return self.user_repo.get_table_version()
+
+    def get_existing_user_ids(self, user_ids):
+        """
+        get_existing_user_ids
+
+        Keep only the user UUIDs that exist, using a single query
+
+        Args:
+            user_ids (iterable): UUIDs to check
+
+        Returns:
+            set: UUIDs of existing users
+        """
+        return self.user_repo.get_existing_ids(user_ids)
+
     def get_user_by_email(self, email):
         """
         get_user_by_email
@@ -81,6 +191,7 @@ class HBnBFacade:
         """
         return self.user_repo.get_user_by_email(email)
 
+    @transactional
     def update_user(self, user_id, user_data):
         """
         Update an existing user with new data if it exists
@@ -98,11 +209,59 @@ class HBnBFacade:
         if not user:
             return None
 
-        user.update(user_data)
-        self.user_repo.update(user, user_data)
+        self.user_repo.update(user_id, user_data)
+        response_cache.invalidate(collection_tag(User), entity_tag(User, user_id))
         return user
 
+    def upgrade_password_hash(self, user, password):
+        """
+        upgrade_password_hash
+
+        Rehash a password that was just verified at the configured
+        cost, in the background, if the stored hash uses another one
+
+        Args:
+            user (User): the user who logged in
+            password (string): the password they logged in with
+
+        Returns:
+            bool: True if a rehash was scheduled
+        """
+        if not user.password_needs_rehash():
+            return False
+        app = current_app._get_current_object()
+        user_id, old_hash = user.id, user.password
+
+        def store(new_hash):
+            with app.app_context():
+                self._replace_password_hash(user_id, old_hash, new_hash)
+
+        return password_hasher.rehash_later(password, store) is not None
+
+    @transactional
+    def _replace_password_hash(self, user_id, old_hash, new_hash):
+        if self.user_repo.replace_password_hash(user_id, old_hash, new_hash):
+            self.user_repo.invalidate(user_id)
+
+    def get_password_costs(self):
+        """
+        get_password_costs
+
+        Count the accounts per password hash cost
+
+        Returns:
+            dict: cost (string, 'unknown' for foreign hashes) -> accounts
+        """
+        costs = Counter()
+        prefixes = self.user_repo.count_by_password_prefix(
+            password_hasher.hasher.cost_prefix_length)
+        for prefix, count in prefixes.items():
+            costs[password_hasher.cost(prefix)] += count
+        return {'unknown' if cost is None else str(cost): count
+                for cost, count in costs.items()}
+
 # AMENITY ENDPOINTS
+    @transactional
     def create_amenity(self, amenity_data):
         """
         create_amenity
@@ -114,10 +273,31 @@ class HBnBFacade:
 
         Returns:
             Amenity: The newly created Amenity object
+
+        Raises:
+            ValueError: if an amenity with the same name exists,
+                ignoring case and spacing
         """
-        amenity = Amenity(**amenity_data)
-        self.amenity_repo.add(amenity)
-        return amenity
+        amenity_id = self.amenity_repo.add_if_name_free(amenity_data['name'])
+        if amenity_id is None:
+            raise ValueError("Amenity already registered")
+        self.amenity_repo.invalidate(amenity_id)
+        response_cache.invalidate(collection_tag(Amenity))
+        return self.amenity_repo.get(amenity_id)
+
+    def find_amenity_by_name(self, name):
+        """
+        find_amenity_by_name
+
+        Retrieve an amenity by name, ignoring case and spacing
+
+        Args:
+            name (string): name of the amenity
+
+        Returns:
+            Amenity: The amenity with this name, None if there is none
+        """
+        return self.amenity_repo.get_amenity_by_name(name)
 
     def get_amenity(self, amenity_id):
         """
@@ -133,6 +313,32 @@ class HBnBFacade:
         """
         return self.amenity_repo.get(amenity_id)
 
+    def get_amenity_version(self, amenity_id):
+        """
+        get_amenity_version
+
+        Version of an amenity for conditional GETs, read without loading it
+
+        Args:
+            amenity_id (UUID): The ID of the amenity
+
+        Returns:
+            tuple: timestamps identifying the current representation,
+                None if the amenity does not exist
+        """
+        return self.amenity_repo.get_version(amenity_id)
+
+    def get_amenities_version(self):
+        """
+        get_amenities_version
+
+        Version of the amenity list for conditional GETs
+
+        Returns:
+            tuple: number of amenities and latest updated_at
+        """
+        return self.amenity_repo.get_table_version()
+
     def get_all_amenities(self):
         """
         get_all_amenities
@@ -145,6 +351,65 @@ class HBnBFacade:
         amenities = self.amenity_repo.get_all()
         return amenities
 
+    def get_amenities_page(self, limit, cursor=None, columns=None):
+        """
+        get_amenities_page
+
+        Retrieve one page of amenities in creation order
+
+        Args:
+            limit (int): maximum number of amenities to return
+            cursor (string): opaque cursor returned by the previous page
+            columns (list): attribute names to load instead of full objects
+
+        Returns:
+            tuple: list of Amenity objects (rows when columns is set)
+                and the cursor of the next page
+        """
+        return self.amenity_repo.get_page(limit, cursor, columns)
+
+    def get_amenity_places_page(self, amenity_id, limit, cursor=None, columns=None):
+        """
+        get_amenity_places_page
+
+        Retrieve one page of the places offering an amenity, without
+        loading the whole Amenity.places collection
+
+        Args:
+            amenity_id (UUID): The ID of the amenity
+            limit (int): maximum number of places to return
+            cursor (string): opaque cursor returned by the previous page
+            columns (list): attribute names to load instead of full objects
+
+        Returns:
+            tuple: list of Place objects (rows when columns is set)
+                and the cursor of the next page
+        """
+        linked = select(place_amenity.c.place_id) \
+            .where(place_amenity.c.amenity_id == str(amenity_id))
+        return self.place_repo.get_page(
+            limit, cursor, columns, filters=(Place.id.in_(linked),))
+
+    def get_amenity_places_version(self, amenity_id):
+        """
+        get_amenity_places_version
+
+        Version of the places offering an amenity for conditional GETs.
+        Links do not touch the places, so their count is part of it.
+
+        Args:
+            amenity_id (UUID): The ID of the amenity
+
+        Returns:
+            tuple: number and latest updated_at of the places,
+                number of links
+        """
+        linked = select(place_amenity.c.place_id) \
+            .where(place_amenity.c.amenity_id == str(amenity_id))
+        return self.place_repo.get_table_version(filters=(Place.id.in_(linked),)) \
+            + (self.place_repo.count_amenity_links([amenity_id]),)
+
+    @transactional
     def update_amenity(self, amenity_id, amenity_data):
         """
         Update an existing amenity with new data if it exists
@@ -164,14 +429,20 @@ class HBnBFacade:
 
         # Check for duplicate name
         if 'name' in amenity_data:
-            existing_amenity = self.amenity_repo.get_by_attribute('name', amenity_data['name'])
-            if existing_amenity and existing_amenity[0].id != amenity_id:
+            existing_amenity = self.find_amenity_by_name(amenity_data['name'])
+            if existing_amenity and existing_amenity.id != amenity_id:
                 raise ValueError("An amenity with this name already exists.")
 
-        self.amenity_repo.update(amenity_id, amenity_data)  # Pass amenity_id
-        return self.amenity_repo.get(amenity_id)  # Return updated amenity
+        try:
+            # The unique index also rejects a rename racing this one
+            amenity = self.amenity_repo.update(amenity_id, amenity_data)
+        except IntegrityError:
+            raise ValueError("An amenity with this name already exists.")
+        response_cache.invalidate(collection_tag(Amenity), entity_tag(Amenity, amenity_id))
+        return amenity
 
 # PLACE ENDPOINTS
+    @transactional
     def create_place(self, place_data):
         """
         create_place
@@ -179,16 +450,49 @@ class HBnBFacade:
         Create a new place and add it to the place repository
 
         Args:
-            place_data (dict): A dictionary containing place data
+            place_data (dict): A dictionary containing place data,
+                amenities being a list of amenity UUIDs
 
         Returns:
             Place: Place model representing the newly created place
+
+        Raises:
+            ValueError: if an amenity does not exist
         """
+        amenity_ids = place_data.pop('amenities', None) or []
         place = Place(**place_data)
+        for amenity_id in amenity_ids:
+            amenity = self.amenity_repo.get(amenity_id)
+            if not amenity:
+                raise ValueError(f"Amenity {amenity_id} not found")
+            place.amenities.append(amenity)
         self.place_repo.add(place)
+        self.place_search.index([place])
+        response_cache.invalidate(collection_tag(Place))
         return place
 
-    def get_place(self, place_id):
+    @transactional
+    def create_places_bulk(self, places_data, chunk_size=1000):
+        """
+        create_places_bulk
+
+        Create many places in one transaction, inserted in chunks
+
+        Args:
+            places_data (list): dictionaries containing place data
+            chunk_size (int): number of rows per INSERT batch
+
+        Returns:
+            list: the newly created Place objects, in input order
+        """
+        places = [Place(**place_data) for place_data in places_data]
+        self.place_repo.add_many(places, chunk_size)
+        response_cache.invalidate(collection_tag(Place))
+        for start in range(0, len(places), chunk_size):
+            self.place_search.index(places[start:start + chunk_size])
+        return places
+
+    def get_place(self, place_id, plan=None):
         """
         get_place
 
@@ -196,6 +500,8 @@ class HBnBFacade:
 
         Args:
             place_id (UUID): The ID of the place to retrieve
+            plan (string): name of a PLACE_LOAD_PLANS entry describing
+                the relationships to load with the place
 
         Returns:
             Place: The place object corresponding to the ID
@@ -203,7 +509,57 @@ class HBnBFacade:
         if not place_id:
             return None
         else:
-            return self.place_repo.get(place_id)
+            return self.place_repo.get(
+                place_id, _load_options(PLACE_LOAD_PLANS, plan))
+
+    def get_place_version(self, place_id):
+        """
+        get_place_version
+
+        Version of a place for conditional GETs, read without loading it.
+        Review writes update the rating aggregates, hence updated_at.
+
+        Args:
+            place_id (UUID): The ID of the place
+
+        Returns:
+            tuple: updated_at of the place and of its owner,
+                None if the place does not exist
+        """
+        return self.place_repo.get_version(place_id)
+
+    def get_places_version(self, amenity_ids=None):
+        """
+        get_places_version
+
+        Version of the place list for conditional GETs
+
+        Args:
+            amenity_ids (list): amenities filtering the list, whose
+                links then belong to the version
+
+        Returns:
+            tuple: number of places and latest updated_at
+                (and number of links of the amenities)
+        """
+        version = self.place_repo.get_table_version()
+        if amenity_ids:
+            version += (self.place_repo.count_amenity_links(amenity_ids),)
+        return version
+
+    def get_existing_place_ids(self, place_ids):
+        """
+        get_existing_place_ids
+
+        Keep only the place UUIDs that exist, using a single query
+
+        Args:
+            place_ids (iterable): UUIDs to check
+
+        Returns:
+            set: UUIDs of existing places
+        """
+        return self.place_repo.get_existing_ids(place_ids)
 
     def get_all_places(self):
         """
@@ -217,6 +573,159 @@ class HBnBFacade:
         places = self.place_repo.get_all()
         return places
 
+    def get_places_page(self, limit, cursor=None, columns=None,
+                        min_price=None, max_price=None, sort='created_at',
+                        amenity_ids=None):
+        """
+        get_places_page
+
+        Retrieve one page of places, optionally within a price range
+
+        Args:
+            limit (int): maximum number of places to return
+            cursor (string): opaque cursor returned by the previous page
+            columns (list): attribute names to load instead of full objects
+            min_price (float): lowest price per night included
+            max_price (float): highest price per night included
+            sort (string): one of PLACE_SORTS
+            amenity_ids (list): keep the places offering all these amenities
+
+        Returns:
+            tuple: list of Place objects (rows when columns is set)
+                and the cursor of the next page
+
+        Raises:
+            ValueError: if the sort or the price range is invalid
+        """
+        filters = self._place_filters(min_price, max_price, sort, amenity_ids)
+        if filters is None:
+            return [], None
+        return self.place_repo.get_page(limit, cursor, columns,
+                                        filters=filters, sort=sort)
+
+    def stream_places(self, columns, min_price=None, max_price=None,
+                      sort='created_at', amenity_ids=None, batch_size=1000):
+        """
+        stream_places
+
+        Iterate over every place matching the filters of
+        get_places_page, fetched in batches
+
+        Args:
+            columns (list): attribute names of the rows
+            batch_size (int): rows fetched per round trip
+
+        Returns:
+            iterator: rows holding the columns, in sort order
+
+        Raises:
+            ValueError: if the sort or the price range is invalid
+        """
+        filters = self._place_filters(min_price, max_price, sort, amenity_ids)
+        if filters is None:
+            return iter(())
+        return self.place_repo.iter_rows(columns, filters, sort, batch_size)
+
+    def _place_filters(self, min_price, max_price, sort, amenity_ids):
+        """
+        SQL filters of a place listing, None when no place can match
+        """
+        if sort not in PLACE_SORTS:
+            raise ValueError(f"sort must be one of {', '.join(PLACE_SORTS)}")
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise ValueError("min_price cannot be greater than max_price")
+        filters = []
+        if min_price is not None:
+            filters.append(Place.price >= min_price)
+        if max_price is not None:
+            filters.append(Place.price <= max_price)
+        if amenity_ids:
+            # The bitmap index counts the matches in memory. A few are sent
+            # as an id list; past AMENITY_FILTER_MAX_IDS, shipping and
+            # parsing the list would cost more than the page, so a
+            # semi-join keeps the cursor and LIMIT working in SQL.
+            matches = amenity_index.count_places_with_all(amenity_ids)
+            if not matches:
+                return None
+            if matches <= current_app.config['AMENITY_FILTER_MAX_IDS']:
+                filters.append(id_filter(Place.id, amenity_index.places_with_all(amenity_ids)))
+            else:
+                filters.append(self.place_repo.having_all_amenities(amenity_ids))
+        return filters
+
+    def search_places_near(self, latitude, longitude, radius_km, limit, columns):
+        """
+        search_places_near
+
+        Find the places within a radius of a point, nearest first
+
+        Args:
+            latitude (float): latitude of the center
+            longitude (float): longitude of the center
+            radius_km (float): search radius in kilometres
+            limit (int): maximum number of places to return
+            columns (list): place attributes to load
+
+        Returns:
+            list: (row, distance in km) tuples
+        """
+        return self.place_repo.get_near(latitude, longitude, radius_km, columns, limit)
+
+    def search_places_in_bbox(self, bbox, limit, columns):
+        """
+        search_places_in_bbox
+
+        Find the places inside a bounding box
+
+        Args:
+            bbox (tuple): min_lat, min_lng, max_lat, max_lng
+                (min_lng > max_lng when crossing the antimeridian)
+            limit (int): maximum number of places to return
+            columns (list): place attributes to load
+
+        Returns:
+            list: place rows
+        """
+        return self.place_repo.get_in_bbox(*bbox, columns, limit=limit)
+
+    def search_places_text(self, text, limit, cursor=None, columns=()):
+        """
+        search_places_text
+
+        Full-text search over place titles and descriptions,
+        best matches first (BM25, titles weigh more)
+
+        Args:
+            text (string): words to look for, the last one as a prefix
+            limit (int): maximum number of places to return
+            cursor (string): opaque cursor returned by the previous page
+            columns (list): place attributes to return with the score
+
+        Returns:
+            tuple: list of rows (id, columns and score)
+                and the cursor of the next page
+
+        Raises:
+            ValueError: if the text or the cursor is invalid
+        """
+        return self.place_search.search(text, limit, cursor, columns)
+
+    @transactional
+    def rebuild_search_index(self):
+        """
+        rebuild_search_index
+
+        Reindex every place for full-text search, e.g. after
+        places were written outside the facade
+
+        Returns:
+            int: number of places indexed
+        """
+        count = self.place_search.rebuild()
+        response_cache.invalidate(collection_tag(Place))
+        return count
+
+    @transactional
     def update_place(self, place_id, place_data):
         """
         Update an existing place with new data if it exists
@@ -234,10 +743,13 @@ class HBnBFacade:
         if not place:
             return None
 
-        self.place_repo.update(place_id, place_data)  # Pass place_id
-        return self.place_repo.get(place_id)  # Return updated place
+        place = self.place_repo.update(place_id, place_data)  # Pass place_id
+        self.place_search.index([place])
+        response_cache.invalidate(collection_tag(Place), entity_tag(Place, place_id))
+        return place  # Return updated place
 
 # REVIEW ENDPOINTS
+    @transactional
     def create_review(self, review_data):
         """
         create_review
@@ -252,8 +764,37 @@ class HBnBFacade:
         """
         review = Review(**review_data)
         self.review_repo.add(review)
+        response_cache.invalidate(collection_tag(Review))
+        self._apply_rating_change(review.place_id, added=[review.rating])
         return review
 
+    @transactional
+    def create_reviews_bulk(self, reviews_data, chunk_size=1000):
+        """
+        create_reviews_bulk
+
+        Create many reviews in one transaction, inserted in chunks
+
+        Args:
+            reviews_data (list): dictionaries containing review data
+            chunk_size (int): number of rows per INSERT batch
+
+        Returns:
+            list: the newly created Review objects, in input order
+        """
+        reviews = [Review(**review_data) for review_data in reviews_data]
+        self.review_repo.add_many(reviews, chunk_size)
+        response_cache.invalidate(collection_tag(Review))
+
+        # One aggregate UPDATE per place rather than per review
+        ratings_by_place = {}
+        for review_data in reviews_data:
+            ratings_by_place.setdefault(review_data['place_id'], []) \
+                .append(review_data['rating'])
+        for place_id, ratings in ratings_by_place.items():
+            self._apply_rating_change(place_id, added=ratings)
+        return reviews
+
     def get_review(self, review_id):
         """
         get_review
@@ -268,6 +809,37 @@ class HBnBFacade:
         """
         return self.review_repo.get(review_id)
 
+    def get_review_version(self, review_id):
+        """
+        get_review_version
+
+        Version of a review for conditional GETs, read without loading it
+
+        Args:
+            review_id (UUID): The ID of the review
+
+        Returns:
+            tuple: timestamps identifying the current representation,
+                None if the review does not exist
+        """
+        return self.review_repo.get_version(review_id)
+
+    def get_reviews_version(self, place_id=None):
+        """
+        get_reviews_version
+
+        Version of the review list, or of the reviews of one place,
+        for conditional GETs
+
+        Args:
+            place_id (UUID): restrict to the reviews of this place
+
+        Returns:
+            tuple: number of reviews and latest updated_at
+        """
+        filters = (Review.place_id == str(place_id),) if place_id else ()
+        return self.review_repo.get_table_version(filters)
+
     def get_all_reviews(self):
         """
         get_all_reviews
@@ -280,6 +852,38 @@ class HBnBFacade:
         reviews = self.review_repo.get_all()
         return reviews
 
+    def get_reviews_page(self, limit, cursor=None, columns=None):
+        """
+        get_reviews_page
+
+        Retrieve one page of reviews in creation order
+
+        Args:
+            limit (int): maximum number of reviews to return
+            cursor (string): opaque cursor returned by the previous page
+            columns (list): attribute names to load instead of full objects
+
+        Returns:
+            tuple: list of Review objects (rows when columns is set)
+                and the cursor of the next page
+        """
+        return self.review_repo.get_page(limit, cursor, columns)
+
+    def stream_reviews(self, columns, batch_size=1000):
+        """
+        stream_reviews
+
+        Iterate over every review in creation order, fetched in batches
+
+        Args:
+            columns (list): attribute names of the rows
+            batch_size (int): rows fetched per round trip
+
+        Returns:
+            iterator: rows holding the columns
+        """
+        return self.review_repo.iter_rows(columns, batch_size=batch_size)
+
     def get_reviews_by_place(self, place_id):
         """
         get_reviews_by_place
@@ -294,6 +898,7 @@ class HBnBFacade:
         """
         return self.review_repo.get_by_attribute('place_id', place_id)
 
+    @transactional
     def update_review(self, review_id, review_data):
         """
         Update an existing review with new data if it exists
@@ -311,9 +916,20 @@ class HBnBFacade:
         if not review:
             return None
 
+        old_place_id, old_rating = review.place_id, review.rating
         self.review_repo.update(review_id, review_data)  # Pass review_id
-        return self.review_repo.get(review_id)  # Return updated review
+        review = self.review_repo.get(review_id)
+        # The text also shows in the reviews of the place
+        response_cache.invalidate(
+            collection_tag(Review), entity_tag(Review, review_id),
+            entity_tag(Place, old_place_id), entity_tag(Place, review.place_id))
 
+        if (review.place_id, review.rating) != (old_place_id, old_rating):
+            self._apply_rating_change(old_place_id, removed=[old_rating])
+            self._apply_rating_change(review.place_id, added=[review.rating])
+        return review  # Return updated review
+
+    @transactional
     def delete_review(self, review_id):
         """
         delete_review
@@ -326,4 +942,35 @@ class HBnBFacade:
         Returns:
             bool: True if the review was deleted, False otherwise
         """
-        return self.review_repo.delete(review_id)
+        review = self.review_repo.get(review_id)
+        if not review:
+            return False
+
+        place_id, rating = review.place_id, review.rating
+        self.review_repo.delete(review_id)
+        response_cache.invalidate(collection_tag(Review), entity_tag(Review, review_id))
+        self._apply_rating_change(place_id, removed=[rating])
+        return True
+
+    def _apply_rating_change(self, place_id, added=(), removed=()):
+        """
+        Keep the rating aggregates of a place in step with its reviews
+        """
+        self.place_repo.apply_rating_change(place_id, added, removed)
+        self.place_repo.invalidate(place_id)
+        response_cache.invalidate(collection_tag(Place), entity_tag(Place, place_id))
+
+    @transactional
+    def rebuild_rating_aggregates(self):
+        """
+        rebuild_rating_aggregates
+
+        Recompute the rating aggregates of every place from its reviews
+
+        Returns:
+            int: number of places updated
+        """
+        count = self.place_repo.rebuild_rating_aggregates()
+        self.place_repo.cache.clear()
+        response_cache.clear()
+        return count
@@ -0,0 +1,11 @@
+"""
+ASGI entry point, served by an asyncio server:
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+
+import os
+from app.asgi import create_asgi_app
+from config import config
+
+app = create_asgi_app(config[os.getenv('FLASK_CONFIG', 'default')])
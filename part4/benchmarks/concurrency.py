@@ -0,0 +1,220 @@
+"""
+Concurrency of the sync server against the ASGI server
+
+Starts each server in its own process on a seeded SQLite database, then
+keeps N keep-alive connections busy with GET requests for a fixed time.
+Reports throughput, latency percentiles, and the server's peak resident
+memory and thread count at every concurrency level:
+- sync: werkzeug threaded, as `app.run` in run.py
+- asgi: uvicorn in front of app.asgi, as asgi.py
+
+    python benchmarks/concurrency.py --concurrency 10,100,500 --duration 10
+
+The ASGI case needs the optional a2wsgi and uvicorn packages and is
+skipped without them.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import TestingConfig  # noqa: E402
+
+
+class BenchmarkConfig(TestingConfig):
+    SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.getenv('BENCHMARK_DB', '')}"
+    SQLITE_PRAGMAS = {'journal_mode': 'WAL', 'busy_timeout': 5000}
+    # Measure the views, not the response cache
+    RESPONSE_CACHE_ENABLED = os.getenv('BENCHMARK_RESPONSE_CACHE') == '1'
+
+
+def seed(places):
+    from app import create_app
+    from app.services import facade
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        owner = facade.create_user({'first_name': 'Bench', 'last_name': 'Owner',
+                                    'email': 'owner@example.com', 'password': 'benchmark'})
+        facade.create_places_bulk([
+            {'title': f'Place {number}', 'description': 'Benchmark place',
+             'price': float(number % 300), 'latitude': 48.0 + number % 100 / 1000,
+             'longitude': 2.0, 'owner_id': owner.id}
+            for number in range(places)])
+
+
+def serve(kind, port):
+    """Run one server in the foreground (child process mode)"""
+    if kind == 'sync':
+        from werkzeug.serving import make_server
+        from app import create_app
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        make_server('127.0.0.1', port, create_app(BenchmarkConfig), threaded=True).serve_forever()
+    else:
+        import uvicorn
+        from app.asgi import create_asgi_app
+        uvicorn.run(create_asgi_app(BenchmarkConfig), host='127.0.0.1', port=port,
+                    log_level='warning', backlog=4096)
+
+
+def asgi_available():
+    try:
+        import a2wsgi  # noqa: F401
+        import uvicorn  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def process_status(pid):
+    """Peak resident memory (MB) and current threads of a process (Linux)"""
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            fields = dict(line.split(':', 1) for line in status)
+    except OSError:
+        return None, None
+    return int(fields['VmHWM'].split()[0]) / 1024, int(fields['Threads'])
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    version, status = lines[0].split()[:2]
+    headers = {name.strip().lower(): value.strip()
+               for name, value in (line.split(':', 1) for line in lines[1:] if ':' in line)}
+    await reader.readexactly(int(headers.get('content-length', 0)))
+    close = headers.get('connection', '').lower() == 'close' or \
+        (version == 'HTTP/1.0' and headers.get('connection', '').lower() != 'keep-alive')
+    return int(status), close
+
+
+async def client(port, path, deadline, latencies, errors):
+    request = f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n'.encode()
+    writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            start = time.perf_counter()
+            writer.write(request)
+            status, close = await asyncio.wait_for(read_response(reader), 30)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+            if close:
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as error:
+            errors.append(type(error).__name__)
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.05)
+    if writer is not None:
+        writer.close()
+
+
+async def load(port, path, concurrency, duration, pid):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    threads = 0
+
+    async def watch():
+        nonlocal threads
+        while time.perf_counter() < deadline:
+            threads = max(threads, process_status(pid)[1] or 0)
+            await asyncio.sleep(0.2)
+
+    started = time.perf_counter()
+    await asyncio.gather(watch(), *(client(port, path, deadline, latencies, errors)
+                                    for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def percentile(share):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * share))] * 1000 \
+            if latencies else float('nan')
+
+    return {'requests': len(latencies), 'rate': len(latencies) / elapsed,
+            'p50': percentile(0.5), 'p99': percentile(0.99), 'errors': len(errors),
+            'rss': process_status(pid)[0], 'threads': threads}
+
+
+def wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"server exited with status {process.returncode}")
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    sys.exit("server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--concurrency', default='10,100,500',
+                        help='comma separated numbers of open connections')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per level')
+    parser.add_argument('--path', default='/api/v1/places/?limit=20', help='URL requested')
+    parser.add_argument('--places', type=int, default=1000, help='places seeded')
+    parser.add_argument('--response-cache', action='store_true',
+                        help='keep the response cache enabled')
+    parser.add_argument('--serve', choices=('sync', 'asgi'), help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    levels = [int(level) for level in args.concurrency.split(',')]
+    kinds = ['sync']
+    if asgi_available():
+        kinds.append('asgi')
+    else:
+        print("a2wsgi or uvicorn is not installed, skipping the ASGI server")
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ['BENCHMARK_DB'] = os.path.join(directory, 'benchmark.db')
+        os.environ['BENCHMARK_RESPONSE_CACHE'] = '1' if args.response_cache else '0'
+        BenchmarkConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.environ['BENCHMARK_DB']}"
+        seed(args.places)
+
+        print(f"{'server':<7}{'conns':>7}{'requests':>10}{'req/s':>9}{'p50 ms':>9}"
+              f"{'p99 ms':>9}{'errors':>8}{'peak MB':>9}{'threads':>9}")
+        for kind in kinds:
+            port = free_port()
+            process = subprocess.Popen([sys.executable, os.path.abspath(__file__),
+                                        '--serve', kind, '--port', str(port)])
+            try:
+                wait_for_port(port, process)
+                for concurrency in levels:
+                    result = asyncio.run(load(port, args.path, concurrency,
+                                              args.duration, process.pid))
+                    print(f"{kind:<7}{concurrency:>7}{result['requests']:>10}"
+                          f"{result['rate']:>9.0f}{result['p50']:>9.1f}{result['p99']:>9.1f}"
+                          f"{result['errors']:>8}{result['rss'] or 0:>9.1f}"
+                          f"{result['threads']:>9}")
+            finally:
+                process.terminate()
+                process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Throughput of the response serialization layer
+
+Serializes a 10k element place list (the shape of GET /api/v1/places/)
+three ways: dicts built inline and json.dumps (the former handlers), the
+compiled serializer and json.dumps, the compiled serializer and orjson.
+
+    python benchmarks/serialize.py --count 10000 --repeat 20
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from collections import namedtuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import TestingConfig  # noqa: E402
+from app import create_app  # noqa: E402
+from app.api.v1 import serializers  # noqa: E402
+from app.api.v1.serializers import encode, serialize_many  # noqa: E402
+from app.models.place import Place, average_rating  # noqa: E402
+
+# A row of the list query (id plus the projected columns)
+Row = namedtuple('Row', 'id title price review_count rating_sum')
+
+
+def inline(rows):
+    return json.dumps([{
+        'id': row.id,
+        'title': row.title,
+        'price': row.price,
+        'review_count': row.review_count,
+        'average_rating': average_rating(row.rating_sum, row.review_count),
+    } for row in rows], separators=(',', ':')).encode('utf-8')
+
+
+def compiled(rows):
+    return encode(serialize_many(Place, 'list', rows))
+
+
+def measure(function, rows, repeat):
+    size, best = 0, float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = len(function(rows))
+        best = min(best, time.perf_counter() - start)
+    return size, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--count', type=int, default=10000, help='places per response')
+    parser.add_argument('--repeat', type=int, default=20, help='runs, the best is kept')
+    args = parser.parse_args()
+
+    rows = [Row(str(uuid.uuid4()), f'Place {number}', float(number % 500),
+                number % 7, (number % 7) * 4) for number in range(args.count)]
+
+    app = create_app(TestingConfig)
+    cases = [('inline dicts + json', inline, 'json'),
+             ('compiled + json', compiled, 'json')]
+    if serializers.orjson is not None:
+        cases.append(('compiled + orjson', compiled, 'orjson'))
+    else:
+        print("orjson is not installed, skipping the orjson case")
+
+    print(f"{'case':<22}{'bytes':>10}{'ms':>10}{'MB/s':>10}")
+    with app.app_context():
+        for name, function, backend in cases:
+            app.config['JSON_ENCODER'] = backend
+            size, elapsed = measure(function, rows, args.repeat)
+            print(f"{name:<22}{size:>10}{elapsed * 1000:>10.1f}"
+                  f"{size / elapsed / 1e6:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
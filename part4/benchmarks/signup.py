@@ -0,0 +1,54 @@
+"""
+Per-signup CPU time of HBnBFacade.create_user
+
+Creates users in an in-memory database with the password hashed inline,
+so the CPU time of this process is the CPU time of a signup, and checks
+that each signup hashes the password exactly once.
+
+    python benchmarks/signup.py --rounds 12 --count 20
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import TestingConfig  # noqa: E402
+from app import create_app  # noqa: E402
+from app.passwords import password_hasher  # noqa: E402
+from app.services import facade  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rounds', type=int, default=12, help='bcrypt cost')
+    parser.add_argument('--count', type=int, default=20, help='signups to time')
+    args = parser.parse_args()
+
+    class BenchmarkConfig(TestingConfig):
+        BCRYPT_LOG_ROUNDS = args.rounds
+
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        hashes_before = password_hasher.stats()['hash']['count']
+        cpu, wall = time.process_time(), time.perf_counter()
+        for number in range(args.count):
+            facade.create_user({'first_name': 'Bench', 'last_name': 'User',
+                                'email': f'bench{number}@example.com',
+                                'password': 'benchmark-password'})
+        cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+        hashes = password_hasher.stats()['hash']['count'] - hashes_before
+
+    print(f"bcrypt rounds      {args.rounds}")
+    print(f"signups            {args.count}")
+    print(f"hashes per signup  {hashes / args.count:g}")
+    print(f"CPU per signup     {cpu / args.count * 1000:.1f} ms")
+    print(f"wall per signup    {wall / args.count * 1000:.1f} ms")
+    if hashes != args.count:
+        sys.exit("create_user must hash each password exactly once")
+
+
+if __name__ == '__main__':
+    main()
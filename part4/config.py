@@ -3,13 +3,96 @@ import os
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
     DEBUG = False
+    API_PAGE_SIZE = 50
+    API_MAX_PAGE_SIZE = 500
+    BULK_CHUNK_SIZE = 1000
+    GEO_MAX_RADIUS_KM = 500
+    OBJECT_CACHE_ENABLED = True
+    OBJECT_CACHE_SIZE = 10000
+    OBJECT_CACHE_DEFAULT_TTL = 300
+    OBJECT_CACHE_TTL = {'Amenity': 3600, 'Review': 60}
+    # Items encoded and sent per chunk by the streamed lists (?stream=)
+    STREAM_BATCH_SIZE = 1000
+    # Encoded public GET responses, dropped by the writes that affect
+    # them; the TTL bounds staleness after writes from other processes
+    RESPONSE_CACHE_ENABLED = True
+    RESPONSE_CACHE_SIZE = 2000
+    RESPONSE_CACHE_TTL = 60
+    # Seconds before the amenity bitmap index reloads links written elsewhere
+    AMENITY_INDEX_TTL = 300
+    # Amenity filters matching more places than this run as a semi-join
+    # on place_amenity instead of an IN list of the matching ids
+    AMENITY_FILTER_MAX_IDS = 1000
+    # Password hashing scheme (see app/passwords.py) and its cost:
+    # each extra bcrypt round doubles the CPU time of a signup or login
+    PASSWORD_HASHER = 'bcrypt'
+    BCRYPT_LOG_ROUNDS = 12
+    # bcrypt runs in worker processes: how many, and how many jobs may wait
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+    PASSWORD_HASH_MAX_QUEUE = 32
+    PASSWORD_HASH_TIMEOUT = 10
+    # Background rehashes (after a cost change) waiting at most; more are
+    # dropped, each one holding a plaintext password until it runs
+    PASSWORD_REHASH_MAX_PENDING = 8
+    # Response encoder: 'orjson' (used when installed) or 'json'
+    JSON_ENCODER = os.getenv('JSON_ENCODER', 'orjson')
+    # Threads running the views behind the ASGI server (asgi.py). A request
+    # holds its thread until its body is sent, slow clients included, so
+    # streamed lists (?stream=) run on ASGI_STREAM_THREADS of their own:
+    # as many slow downloads make further ones wait, not the other routes.
+    # Keep the sum within the database pool (pool_size + max_overflow).
+    ASGI_THREADS = int(os.getenv('ASGI_THREADS', 10))
+    ASGI_STREAM_THREADS = int(os.getenv('ASGI_STREAM_THREADS', 4))
+    # Applied with PRAGMA on every new SQLite connection
+    SQLITE_PRAGMAS = {}
 
 class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///development.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    AUTO_MIGRATE = True
+    BCRYPT_LOG_ROUNDS = 10
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'busy_timeout': 5000,
+    }
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    AUTO_MIGRATE = True
+    # Minimum bcrypt cost, hashed inline: tests create many users
+    BCRYPT_LOG_ROUNDS = 4
+    PASSWORD_HASH_WORKERS = 0
+
+class ProductionConfig(Config):
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///production.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    AUTO_MIGRATE = os.getenv('AUTO_MIGRATE', '0') == '1'
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    # WAL lets readers run alongside the single writer, NORMAL sync is
+    # durable in WAL mode, and writers wait instead of failing with
+    # "database is locked"
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000)),
+        'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 268435456)),
+        'cache_size': -64000,
+        'temp_store': 'MEMORY',
+    }
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': 30,
+        'pool_recycle': 1800,
+        'pool_pre_ping': True,
+    }
 
 config = {
     'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig,
     'default': DevelopmentConfig
 }
@@ -1,8 +1,7 @@
+import os
 from app import create_app
-from app.services.facade import HBnBFacade
-
-app = create_app()
-facade = HBnBFacade()
+from app.services import facade
+from config import config
 
 def create_admin_user():
     admin_data = {
@@ -20,6 +19,9 @@ def create_admin_user():
         print(f"Admin user created: {new_admin.email}")
 
 if __name__ == "__main__":
+    # Built only here: the password hasher's worker processes import
+    # this file again (as __mp_main__) and need no application
+    app = create_app(config[os.getenv('FLASK_CONFIG', 'default')])
     with app.app_context():  # Ensure application context is active
         create_admin_user()
-    app.run(debug=True)
+    app.run(debug=app.config['DEBUG'])
@@ -22,16 +22,26 @@ function checkAuthentication() {
     if (loginLink) loginLink.style.display = 'block';
   } else {
     if (loginLink) loginLink.style.display = 'none';
+    setupPriceFilter(token);
     fetchPlaces(token);
   }
 }
 
 /**
- * Fetch the list of places from the API
+ * Fetch one page of places from the API
+ *
+ * @param {string} token - JWT of the logged in user
+ * @param {string} maxPrice - highest price per night, or null for all
+ * @param {string} cursor - X-Next-Cursor of the previous page, or null
  */
-async function fetchPlaces(token) {
+async function fetchPlaces(token, maxPrice = null, cursor = null) {
   try {
-    const response = await fetch('http://127.0.0.1:5000/api/v1/places', {
+    // The price filter runs on the server, only the displayed page is sent
+    const url = new URL('http://127.0.0.1:5000/api/v1/places/');
+    if (maxPrice) url.searchParams.set('max_price', maxPrice);
+    if (cursor) url.searchParams.set('cursor', cursor);
+
+    const response = await fetch(url, {
       method: 'GET',
       headers: {
         'Content-Type': 'application/json',
@@ -39,12 +49,15 @@ async function fetchPlaces(token) {
       }
     });
 
-    if (response.ok) {
-      const places = await response.json();
-      displayPlaces(places);
-    } else {
+    if (!response.ok) {
       alert('Error loading places');
+      return;
     }
+    const places = await response.json();
+    const nextCursor = response.headers.get('X-Next-Cursor');
+
+    displayPlaces(places, Boolean(cursor));
+    displayLoadMore(nextCursor && (() => fetchPlaces(token, maxPrice, nextCursor)));
   } catch (error) {
     console.error('API error:', error);
     alert('Unable to load places.');
@@ -55,31 +68,52 @@ async function fetchPlaces(token) {
  * Dynamically create and display place elements
  * 
  * @param {string} places - places name
+ * @param {boolean} append - keep the places already displayed
  */
-function displayPlaces(places) {
+function displayPlaces(places, append = false) {
   const listContainer = document.getElementById('places-list');
-  listContainer.innerHTML = '';
+  if (!append) listContainer.innerHTML = '';
 
   places.forEach(place => {
     const article = document.createElement('article');
     article.className = 'place-card';
     article.setAttribute('data-price', place.price);
     article.innerHTML = `
-      <h2>${place.name}</h2>
+      <h2>${place.name || place.title}</h2>
       <p>${place.description || ''}</p>
       <p>Price per night: ${place.price}€</p>
       <a href="place.html" class="details-button">View Details</a>
     `;
     listContainer.appendChild(article);
   });
+}
 
-  setupPriceFilter();
+/**
+ * Show a "Load more" button below the list while there is a next page
+ *
+ * @param {function} loadNext - loads the next page, or null on the last page
+ */
+function displayLoadMore(loadNext) {
+  let button = document.getElementById('load-more');
+  if (!loadNext) {
+    if (button) button.remove();
+    return;
+  }
+  if (!button) {
+    button = document.createElement('button');
+    button.id = 'load-more';
+    button.textContent = 'Load more';
+    document.getElementById('places-list').after(button);
+  }
+  button.onclick = loadNext;
 }
 
 /**
  * Add event listener and handle price filter dropdown
+ *
+ * @param {string} token - JWT of the logged in user
  */
-function setupPriceFilter() {
+function setupPriceFilter(token) {
   const priceFilter = document.getElementById('price-filter');
   if (!priceFilter) return;
 
@@ -93,20 +127,10 @@ function setupPriceFilter() {
     });
   }
 
-  // Handle filter change
+  // Ask the server for the matching places instead of hiding cards
   priceFilter.addEventListener('change', (event) => {
     const selected = event.target.value;
-    const placeCards = document.querySelectorAll('.place-card');
-
-    placeCards.forEach(card => {
-      const price = parseInt(card.getAttribute('data-price'));
-
-      if (selected === 'All' || price <= parseInt(selected)) {
-        card.style.display = 'block';
-      } else {
-        card.style.display = 'none';
-      }
-    });
+    fetchPlaces(token, selected === 'All' ? null : selected);
   });
 }
 
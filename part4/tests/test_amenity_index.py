@@ -0,0 +1,103 @@
+import threading
+import time
+import unittest
+from unittest import mock
+from app import create_app
+from app.persistence.amenity_index import amenity_index
+from app.services import facade
+from config import TestingConfig
+
+
+class TestAmenityBitmapIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.context = self.app.app_context()
+        self.context.push()
+        owner = facade.create_user({'first_name': 'Index', 'last_name': 'Owner',
+                                    'email': 'index@example.com', 'password': 'secret'})
+        self.wifi = facade.create_amenity({'name': 'Wifi'}).id
+        self.pool = facade.create_amenity({'name': 'Pool'}).id
+        self.expected = {self.wifi: set(), self.pool: set()}
+        for number in range(50):
+            amenities = [amenity_id for amenity_id, step in ((self.wifi, 2), (self.pool, 3))
+                         if number % step == 0]
+            place = facade.create_place({
+                'title': f'Place {number}', 'description': '', 'price': 10.0,
+                'latitude': 1.0, 'longitude': 1.0, 'owner_id': owner.id,
+                'amenities': amenities})
+            for amenity_id in amenities:
+                self.expected[amenity_id].add(place.id)
+        amenity_index.rebuild()
+
+    def tearDown(self):
+        self.context.pop()
+
+    def test_rebuild_and_intersection(self):
+        """
+        Test that the rebuilt bitmaps return the linked places
+        """
+        self.assertEqual(amenity_index.places_with_all([self.wifi]), self.expected[self.wifi])
+        self.assertEqual(amenity_index.places_with_all([self.wifi, self.pool]),
+                         self.expected[self.wifi] & self.expected[self.pool])
+        self.assertEqual(amenity_index.places_with_all([]), set())
+
+    def test_large_match_sets_use_a_semi_join(self):
+        """
+        Test that paging over many matches gives the same places with the
+        id list and with the semi-join, without decoding the bitmaps
+        """
+        self.assertEqual(amenity_index.count_places_with_all([self.wifi]), 25)
+
+        def pages(amenity_ids):
+            found, cursor = [], None
+            while True:
+                places, cursor = facade.get_places_page(
+                    4, cursor, ('title',), amenity_ids=amenity_ids)
+                found.extend(place.id for place in places)
+                if not cursor:
+                    return found
+
+        for amenity_ids in ([self.wifi], [self.wifi, self.pool]):
+            with self.subTest(amenities=len(amenity_ids)):
+                listed = pages(amenity_ids)
+                with mock.patch.dict(self.app.config, AMENITY_FILTER_MAX_IDS=1), \
+                        mock.patch.object(amenity_index, 'places_with_all') as decode:
+                    joined = pages(amenity_ids)
+                decode.assert_not_called()
+                self.assertEqual(joined, listed)
+                self.assertEqual(set(listed), set.intersection(
+                    *(self.expected[amenity_id] for amenity_id in amenity_ids)))
+
+    def test_expired_index_is_rebuilt_once(self):
+        """
+        Test that concurrent requests seeing an expired index start a
+        single rebuild and keep reading the previous snapshot meanwhile
+        """
+        rebuild = amenity_index._rebuild
+        calls = []
+
+        def slow_rebuild():
+            calls.append(1)
+            time.sleep(0.2)
+            return rebuild()
+
+        results = []
+
+        def request():
+            with self.app.app_context():
+                results.append(amenity_index.places_with_all([self.pool]))
+
+        with mock.patch.object(amenity_index, 'ttl', -1), \
+                mock.patch.object(amenity_index, '_rebuild', slow_rebuild):
+            threads = [threading.Thread(target=request) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [self.expected[self.pool]] * 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
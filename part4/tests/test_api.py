@@ -0,0 +1,138 @@
+import unittest
+from sqlalchemy import event, func, select
+from app import create_app
+from app.extensions import db
+from app.models.place import Place
+from app.persistence.cache import object_cache, response_cache
+from app.services import facade
+from config import TestingConfig
+
+
+class ApiConfig(TestingConfig):
+    JWT_SECRET_KEY = 'test-secret-key-long-enough-for-hs256'
+    JWT_VERIFY_SUB = False  # the identity is a dict
+
+
+class ApiTestCase(unittest.TestCase):
+
+    def setUp(self):
+        object_cache.clear()
+        response_cache.clear()
+        self.app = create_app(ApiConfig)
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            self.owner_id = facade.create_user({
+                'first_name': 'Api', 'last_name': 'Owner', 'email': 'api@example.com',
+                'password': 'secret', 'is_admin': True}).id
+        token = self.client.post('/api/v1/auth/login', json={
+            'email': 'api@example.com', 'password': 'secret'}).json['access_token']
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    def create_places(self, titles):
+        with self.app.app_context():
+            return [place.id for place in facade.create_places_bulk([
+                {'title': title, 'description': 'A place', 'price': 10.0,
+                 'latitude': 1.0, 'longitude': 1.0, 'owner_id': self.owner_id}
+                for title in titles])]
+
+    def count_places(self):
+        with self.app.app_context():
+            return db.session.execute(select(func.count()).select_from(Place)).scalar()
+
+    def follow_pages(self, url):
+        """Ids of every item, following X-Next-Cursor until the last page"""
+        ids = []
+        while True:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(item['id'] for item in response.json)
+            cursor = response.headers.get('X-Next-Cursor')
+            if not cursor:
+                return ids
+            url = f"{url.split('&cursor=')[0]}&cursor={cursor}"
+
+
+class TestUnitOfWork(ApiTestCase):
+
+    def test_failed_request_leaves_no_row(self):
+        """
+        Test that a 400 from create_place (unknown amenity) leaves no place
+        """
+        with self.app.app_context():
+            amenity_id = facade.create_amenity({'name': 'Wifi'}).id
+        response = self.client.post('/api/v1/places/', headers=self.headers, json={
+            'title': 'Nowhere', 'price': 10.0, 'latitude': 1.0, 'longitude': 1.0,
+            'amenities': [amenity_id, 'missing']})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.count_places(), 0)
+
+    def test_error_response_rolls_back_flushed_writes(self):
+        """
+        Test that writes flushed by a request answering 400 are rolled back
+        """
+        app = create_app(ApiConfig)
+
+        @app.route('/test/write-then-fail', methods=['POST'])
+        def write_then_fail():
+            facade.create_amenity({'name': 'Rolled back'})
+            return {'error': 'failed after writing'}, 400
+
+        response = app.test_client().post('/test/write-then-fail')
+        self.assertEqual(response.status_code, 400)
+        with app.app_context():
+            self.assertIsNone(facade.find_amenity_by_name('Rolled back'))
+
+    def test_successful_request_commits_once(self):
+        """
+        Test that a successful write request is committed exactly once
+        """
+        with self.app.app_context():
+            amenity_id = facade.create_amenity({'name': 'Wifi'}).id
+        commits = []
+
+        def count_commit(session):
+            commits.append(session)
+
+        event.listen(db.session, 'after_commit', count_commit)
+        try:
+            response = self.client.post('/api/v1/places/', headers=self.headers, json={
+                'title': 'Somewhere', 'price': 10.0, 'latitude': 1.0, 'longitude': 1.0,
+                'amenities': [amenity_id]})
+        finally:
+            event.remove(db.session, 'after_commit', count_commit)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(commits), 1)
+        self.assertEqual(self.count_places(), 1)
+
+
+class TestPaging(ApiTestCase):
+
+    def test_cursor_pages_cover_the_list(self):
+        """
+        Test that following X-Next-Cursor returns every place once, in
+        creation order
+        """
+        ids = self.create_places([f'Place {number}' for number in range(7)])
+        self.assertEqual(self.follow_pages('/api/v1/places/?limit=3'), ids)
+
+    def test_invalid_cursor(self):
+        """
+        Test that a malformed cursor is a 400
+        """
+        response = self.client.get('/api/v1/places/?limit=3&cursor=garbage')
+        self.assertEqual(response.status_code, 400)
+
+    def test_text_search_pages(self):
+        """
+        Test that ?q= results are paged with the cursor, without
+        repeating or missing a match
+        """
+        ids = self.create_places([f'Sunny loft {number}' for number in range(5)] +
+                                 ['Dark cellar'])
+        found = self.follow_pages('/api/v1/places/search?q=loft&limit=2')
+        self.assertEqual(len(found), 5)
+        self.assertEqual(set(found), set(ids[:5]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import os
+import shutil
+import tempfile
+import unittest
+from app import create_app
+from app.models.user import User
+from app.persistence.cache import ResponseCache, object_cache
+from app.persistence.unit_of_work import unit_of_work
+from app.services import facade
+from config import TestingConfig
+
+
+class TestObjectCacheWriteRace(unittest.TestCase):
+    """
+    A writer and a reader each use their own app context, hence their
+    own session, on a file database so the reader only sees what the
+    writer committed.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        class Config(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(self.directory, 'hbnb.db')}"
+            SQLITE_PRAGMAS = {'journal_mode': 'WAL'}
+
+        self.app = create_app(Config)
+        object_cache.clear()
+        with self.app.app_context():
+            self.user_id = facade.create_user({
+                'first_name': 'Old', 'last_name': 'Name',
+                'email': 'race@example.com', 'password': 'secret'}).id
+
+    def tearDown(self):
+        object_cache.clear()
+        shutil.rmtree(self.directory)
+
+    def first_name(self):
+        with self.app.app_context():
+            return facade.get_user(self.user_id).first_name
+
+    def test_read_during_write_is_not_cached(self):
+        """
+        Test that a read missing while a write is uncommitted does not
+        keep the old row cached once the write commits
+        """
+        with self.app.app_context():
+            with unit_of_work.transaction():
+                facade.update_user(self.user_id, {'first_name': 'New'})
+                self.assertEqual(self.first_name(), 'Old')
+        self.assertEqual(self.first_name(), 'New')
+
+    def test_read_started_before_commit_is_not_cached(self):
+        """
+        Test that a row loaded before a write commits is not stored
+        when the reader finishes after the commit
+        """
+        with self.app.app_context():
+            ticket = object_cache.begin_read()
+            stale = facade.user_repo.repository.get(self.user_id)
+            with self.app.app_context():
+                facade.update_user(self.user_id, {'first_name': 'New'})
+            object_cache.put(User, stale, ticket)
+        self.assertEqual(self.first_name(), 'New')
+        self.assertEqual(object_cache.stats()['stale_skips'], 1)
+
+    def test_uncommitted_write_is_not_cached(self):
+        """
+        Test that reading an object written in the same transaction
+        does not cache values that are then rolled back
+        """
+        with self.app.app_context():
+            with self.assertRaises(RuntimeError):
+                with unit_of_work.transaction():
+                    facade.update_user(self.user_id, {'first_name': 'Rolled back'})
+                    self.assertEqual(facade.get_user(self.user_id).first_name, 'Rolled back')
+                    raise RuntimeError
+        self.assertEqual(self.first_name(), 'Old')
+
+    def test_committed_read_is_cached(self):
+        """
+        Test that reads with no write in between are served from the cache
+        """
+        self.first_name()
+        hits = object_cache.stats()['hits']
+        self.assertEqual(self.first_name(), 'Old')
+        self.assertEqual(object_cache.stats()['hits'], hits + 1)
+
+
+class TestResponseCacheInvalidation(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.cache = ResponseCache()
+
+    def test_unrelated_write_does_not_skip_set(self):
+        """
+        Test that a write to another tag while a response is computed
+        does not keep it out of the cache
+        """
+        with self.app.app_context():
+            ticket = self.cache.begin_read()
+            self.cache.invalidate('User', 'User:1')
+            self.cache.set('/places/', 'body', ['Place'], ticket)
+        self.assertEqual(self.cache.get('/places/'), 'body')
+
+    def test_write_to_own_tag_skips_set(self):
+        """
+        Test that a response whose tag was invalidated while it was
+        computed is not stored
+        """
+        with self.app.app_context():
+            ticket = self.cache.begin_read()
+            self.cache.invalidate('Place:1')
+            self.cache.set('/places/1', 'body', ['Place:1'], ticket)
+        self.assertIsNone(self.cache.get('/places/1'))
+        self.assertEqual(self.cache.stats()['stale_skips'], 1)
+
+    def test_forgotten_invalidations_skip_older_tickets(self):
+        """
+        Test that once old invalidations are forgotten, responses
+        computed before them are not stored
+        """
+        self.cache.max_invalidations = 2
+        with self.app.app_context():
+            ticket = self.cache.begin_read()
+            for number in range(3):
+                self.cache.invalidate(f'Place:{number}')
+            self.cache.set('/places/0', 'body', ['Place:0'], ticket)
+            self.assertIsNone(self.cache.get('/places/0'))
+            ticket = self.cache.begin_read()
+            self.cache.set('/places/0', 'body', ['Place:0'], ticket)
+        self.assertEqual(self.cache.get('/places/0'), 'body')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+from app import create_app
+from app.api.v1.conditional import list_validators
+from config import TestingConfig
+
+
+class TestConditionalGets(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+
+    def test_missing_place_reviews_is_not_found(self):
+        """
+        Test that an ETag matching an empty review list does not turn
+        the reviews of a missing place into a 304
+        """
+        path = '/api/v1/places/missing/reviews'
+        with self.app.test_request_context(path):
+            etag = list_validators((0, None))['ETag']
+        response = self.client.get(path, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
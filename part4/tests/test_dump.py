@@ -0,0 +1,101 @@
+import os
+import shutil
+import tempfile
+import unittest
+from sqlalchemy import select
+from app import create_app
+from app.extensions import db
+from app.models.place import Place, place_amenity
+from app.persistence import dump
+from app.persistence.cache import object_cache
+from app.services import facade
+from config import TestingConfig
+
+
+class TestCatalogDump(unittest.TestCase):
+    """
+    Exports from one in-memory database and imports into another
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.source = create_app(TestingConfig)
+        self.target = create_app(TestingConfig)
+        with self.source.app_context():
+            owner = facade.create_user({'first_name': 'Dump', 'last_name': 'Owner',
+                                        'email': 'dump@example.com', 'password': 'secret'})
+            self.wifi = facade.create_amenity({'name': 'WiFi'}).id
+            self.place_id = facade.create_place({
+                'title': 'Backslash', 'description': '\\N', 'price': 10.0,
+                'latitude': 1.0, 'longitude': 1.0, 'owner_id': owner.id,
+                'amenities': [self.wifi]}).id
+            self.empty_id = facade.create_place({
+                'title': 'Empty', 'price': 10.0, 'latitude': 1.0, 'longitude': 1.0,
+                'owner_id': owner.id}).id
+
+    def tearDown(self):
+        object_cache.clear()
+        shutil.rmtree(self.directory)
+
+    def round_trip(self, fmt):
+        with self.source.app_context():
+            dump.export_tables(self.directory, fmt)
+        object_cache.clear()
+        with self.target.app_context():
+            dump.import_tables(self.directory, fmt)
+
+    def description(self, place_id):
+        return db.session.execute(
+            select(Place.description).where(Place.id == place_id)).scalar()
+
+    def test_ndjson_keeps_backslash_n_strings(self):
+        """
+        Test that "\\N" is a string in NDJSON, not NULL
+        """
+        self.round_trip('ndjson')
+        with self.target.app_context():
+            self.assertEqual(self.description(self.place_id), '\\N')
+            self.assertIsNone(self.description(self.empty_id))
+
+    def test_csv_null_marker(self):
+        """
+        Test that \\N stands for NULL in CSV while a "\\N" string
+        stays a string
+        """
+        self.round_trip('csv')
+        with self.target.app_context():
+            self.assertEqual(self.description(self.place_id), '\\N')
+            self.assertIsNone(self.description(self.empty_id))
+
+    def test_csv_ragged_rows(self):
+        """
+        Test that a CSV row with more or fewer fields than its header is
+        a ValueError naming the line
+        """
+        path = os.path.join(self.directory, 'amenities.csv')
+        for line, fields in (('a,Pool,\\N,\\N,\\N,extra', 6), ('a,Pool', 2)):
+            with self.subTest(fields=fields):
+                with open(path, 'w', encoding='utf-8') as output:
+                    output.write(f'id,name,name_key,created_at,updated_at\n{line}\n')
+                with self.target.app_context():
+                    with self.assertRaisesRegex(
+                            ValueError, f'line 2 has {fields} fields, header has 5'):
+                        dump.import_tables(self.directory, 'csv')
+
+    def test_links_follow_merged_amenity(self):
+        """
+        Test that links to an amenity skipped for its name move to the
+        amenity already holding that name
+        """
+        with self.target.app_context():
+            existing = facade.create_amenity({'name': ' wifi '}).id
+        self.round_trip('ndjson')
+        with self.target.app_context():
+            links = db.session.execute(
+                select(place_amenity.c.place_id, place_amenity.c.amenity_id)).all()
+        self.assertNotEqual(existing, self.wifi)
+        self.assertEqual(links, [(self.place_id, existing)])
+
+
+if __name__ == '__main__':
+    unittest.main()
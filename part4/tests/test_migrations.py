@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+import unittest
+from app import create_app
+from app.extensions import db
+from app.persistence import migrations
+from config import TestingConfig
+
+
+class TestAmenityNameKeyMigration(unittest.TestCase):
+    """
+    Migrates a file database up to version 6, adds amenities differing
+    only by case, then applies the name_key migration
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        class Config(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(self.directory, 'hbnb.db')}"
+            AUTO_MIGRATE = False
+
+        self.app = create_app(Config)
+        self.context = self.app.app_context()
+        self.context.push()
+        migrations.upgrade(target=6)
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.context.pop()
+        shutil.rmtree(self.directory)
+
+    def execute(self, statement, *params):
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql(statement, *params)
+
+    def rows(self, query):
+        with db.engine.begin() as connection:
+            return connection.exec_driver_sql(query).all()
+
+    def test_case_variants_are_merged(self):
+        """
+        Test that later case variants of an amenity name are deleted,
+        their places linked to the first one, and every row keyed
+        """
+        self.execute("INSERT INTO users (id, first_name, last_name, email, password) "
+                     "VALUES ('u', 'Mig', 'Owner', 'mig@example.com', 'secret')")
+        self.execute("INSERT INTO places (id, title, price, latitude, longitude, owner_id) "
+                     "VALUES (?, ?, 10.0, 1.0, 1.0, 'u')", [('p1', 'One'), ('p2', 'Two')])
+        self.execute("INSERT INTO amenities (id, name, created_at) VALUES (?, ?, ?)",
+                     [('a1', 'WiFi', '2024-01-01'), ('a2', 'wifi ', '2024-01-02'),
+                      ('a3', 'WIFI', '2024-01-03'), ('a4', 'Pool', '2024-01-04')])
+        self.execute("INSERT INTO place_amenity (place_id, amenity_id) VALUES (?, ?)",
+                     [('p1', 'a1'), ('p1', 'a2'), ('p2', 'a3'), ('p2', 'a4')])
+
+        self.assertEqual(migrations.upgrade(target=7), [7])
+        self.assertEqual(
+            self.rows("SELECT id, name_key FROM amenities ORDER BY id"),
+            [('a1', 'wifi'), ('a4', 'pool')])
+        self.assertEqual(
+            self.rows("SELECT place_id, amenity_id FROM place_amenity "
+                         "ORDER BY place_id, amenity_id"),
+            [('p1', 'a1'), ('p2', 'a1'), ('p2', 'a4')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from app.passwords import PasswordHasher, PasswordHasherBusy
+
+
+class TestPasswordHasherLimits(unittest.TestCase):
+
+    def make_hasher(self, **config):
+        hasher = PasswordHasher()
+        defaults = {'BCRYPT_LOG_ROUNDS': 4, 'PASSWORD_HASH_MAX_QUEUE': 0}
+        hasher.init_app(SimpleNamespace(config=dict(defaults, **config)))
+        self.addCleanup(hasher.shutdown)
+        return hasher
+
+    def test_timed_out_job_keeps_its_slot(self):
+        """
+        Test that a timeout answers busy, and that the job still counts
+        against the limit until the worker is done with it
+        """
+        hasher = self.make_hasher(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_TIMEOUT=30)
+        hasher._run('hash', time.sleep, 0)  # start the worker process
+        hasher.timeout = 0.2
+        with self.assertRaisesRegex(PasswordHasherBusy, 'timed out'):
+            hasher._run('hash', time.sleep, 1)
+        with self.assertRaisesRegex(PasswordHasherBusy, 'in progress'):
+            hasher._run('hash', time.sleep, 0)
+        self.assertEqual(hasher.stats()['in_flight'], 1)
+        time.sleep(1.5)
+        self.assertEqual(hasher.stats()['in_flight'], 0)
+        hasher._run('hash', time.sleep, 0)
+        self.assertEqual(hasher.stats()['timed_out'], 1)
+
+    def test_rehash_is_dropped_when_the_queue_is_full(self):
+        """
+        Test that rehashes beyond PASSWORD_REHASH_MAX_PENDING are skipped
+        when submitted rather than queued with their password
+        """
+        hasher = self.make_hasher(PASSWORD_HASH_WORKERS=0, PASSWORD_HASH_MAX_QUEUE=4,
+                                  PASSWORD_REHASH_MAX_PENDING=2)
+        release = threading.Event()
+        stored = []
+
+        def store(new_hash):
+            release.wait(5)
+            stored.append(new_hash)
+
+        futures = [hasher.rehash_later('secret', store) for _ in range(5)]
+        self.assertEqual(sum(future is None for future in futures), 3)
+        self.assertEqual(hasher.stats()['rehash_skipped'], 3)
+        release.set()
+        for future in futures:
+            if future is not None:
+                future.result(5)
+        self.assertEqual(len(stored), 2)
+        self.assertIsNotNone(hasher.rehash_later('secret', stored.append))
+
+
+if __name__ == '__main__':
+    unittest.main()
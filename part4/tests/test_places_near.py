@@ -0,0 +1,82 @@
+import random
+import unittest
+from unittest import mock
+from app import create_app
+from app.models import geo
+from app.persistence import place_repository
+from app.services import facade
+from config import TestingConfig
+
+
+class TestPlacesNear(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.context = self.app.app_context()
+        self.context.push()
+        owner = facade.create_user({'first_name': 'Geo', 'last_name': 'Owner',
+                                    'email': 'geo@example.com', 'password': 'secret'})
+        generator = random.Random(12)
+        # A dense cluster around the center, and places spread up to ~300 km
+        self.points = [(48.85 + generator.uniform(-0.01, 0.01),
+                        2.35 + generator.uniform(-0.01, 0.01)) for _ in range(300)]
+        self.points += [(48.85 + generator.uniform(-3, 3),
+                         2.35 + generator.uniform(-3, 3)) for _ in range(700)]
+        facade.create_places_bulk([
+            {'title': f'Place {number}', 'description': '', 'price': 10.0,
+             'latitude': latitude, 'longitude': longitude, 'owner_id': owner.id}
+            for number, (latitude, longitude) in enumerate(self.points)])
+
+    def tearDown(self):
+        self.context.pop()
+
+    def expected(self, latitude, longitude, radius_km, limit):
+        distances = sorted(geo.haversine_km(latitude, longitude, *point)
+                           for point in self.points)
+        return [distance for distance in distances if distance <= radius_km][:limit]
+
+    def near(self, latitude, longitude, radius_km, limit):
+        hits = facade.search_places_near(latitude, longitude, radius_km, limit, ['id'])
+        return [distance for _, distance in hits]
+
+    def test_matches_a_full_scan(self):
+        """
+        Test that the expanding search returns the nearest places
+        """
+        for latitude, longitude in ((48.85, 2.35), (50.0, 4.0), (46.0, 0.0)):
+            for radius_km, limit in ((1, 10), (50, 20), (500, 100), (500, 5)):
+                with self.subTest(latitude=latitude, radius_km=radius_km, limit=limit):
+                    self.assertEqual(self.near(latitude, longitude, radius_km, limit),
+                                     self.expected(latitude, longitude, radius_km, limit))
+
+    def test_dense_area_is_bisected(self):
+        """
+        Test that boxes over the candidate cap are narrowed, not truncated
+        """
+        with mock.patch.object(place_repository, 'NEAR_MAX_CANDIDATES', 50), \
+                mock.patch.object(place_repository, 'NEAR_START_KM', 100):
+            self.assertEqual(self.near(48.85, 2.35, 500, 10),
+                             self.expected(48.85, 2.35, 500, 10))
+
+    def test_candidates_are_capped(self):
+        """
+        Test that no step reads more than the candidate cap
+        """
+        get_in_bbox = place_repository.PlaceRepository.get_in_bbox
+        limits = []
+
+        def spy(repository, *args, limit=None):
+            rows = get_in_bbox(repository, *args, limit=limit)
+            limits.append((limit, len(rows)))
+            return rows
+
+        with mock.patch.object(place_repository, 'NEAR_MAX_CANDIDATES', 50), \
+                mock.patch.object(place_repository.PlaceRepository, 'get_in_bbox', spy):
+            self.near(48.85, 2.35, 500, 10)
+        self.assertTrue(limits)
+        self.assertTrue(all(count <= limit for limit, count in limits))
+        self.assertTrue(all(limit == 51 for limit, _ in limits))
+
+
+if __name__ == '__main__':
+    unittest.main()